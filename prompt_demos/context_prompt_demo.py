@@ -2,20 +2,7 @@
 Prompt Engineering Demo: Bad vs Good Examples
 """
 
-from openai import OpenAI
-
-client = OpenAI()
-
-def get_response(prompt):
-    """Get AI response with error handling"""
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        return f"Error: {str(e)}"
+from llm_client import get_client, get_response
 
 # BAD PROMPT - Vague and lacks context
 print("❌ BAD PROMPT:")
@@ -52,4 +39,6 @@ print("KEY TIPS:")
 print("• Be specific about context and constraints")
 print("• Ask for structured output")
 print("• Include all relevant details")
-print("• Test and refine your prompts")
\ No newline at end of file
+print("• Test and refine your prompts")
+
+print("\n" + get_client().format_summary())
\ No newline at end of file
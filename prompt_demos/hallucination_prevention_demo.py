@@ -5,10 +5,11 @@ This script demonstrates both BAD and GOOD approaches
 to prevent hallucinations when using OpenAI models.
 """
 
-from openai import OpenAI
 import re
 
-client = OpenAI()
+from llm_client import get_client
+
+client = get_client()
 
 # -------------------------------
 # BAD EXAMPLE: Hallucination Risk
@@ -17,8 +18,7 @@ def bad_example():
     print("\n--- BAD EXAMPLE (Hallucination Risk) ---")
     user_question = "What is the capital of Atlantis?"
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
+    response = client.chat(
         messages=[
             {"role": "user", "content": user_question}
         ]
@@ -43,8 +43,7 @@ def grounding_example():
     if city in knowledge_base:
         print("Grounded Answer:", knowledge_base[city])
     else:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = client.chat(
             messages=[
                 {"role": "system", "content": "If the answer is unknown, say 'I don’t know'."},
                 {"role": "user", "content": user_question}
@@ -58,8 +57,7 @@ def grounding_example():
 # -------------------------------
 def citation_example():
     print("\n--- GOOD EXAMPLE 2 (Require Citations) ---")
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
+    response = client.chat(
         messages=[
             {"role": "system", "content": "Always provide a reliable source (URL, book, or paper). If no source, say 'No reliable source available'."},
             {"role": "user", "content": "Who discovered Atlantis?"}
@@ -73,8 +71,7 @@ def citation_example():
 # -------------------------------
 def refusal_policy_example():
     print("\n--- GOOD EXAMPLE 3 (Refusal Policy) ---")
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
+    response = client.chat(
         messages=[
             {"role": "system", "content": "You must never make up facts. If you don’t know, answer 'I don’t know'."},
             {"role": "user", "content": "What is the population of Mars in 2025?"}
@@ -88,8 +85,7 @@ def refusal_policy_example():
 # -------------------------------
 def validation_example():
     print("\n--- GOOD EXAMPLE 4 (Validation Layer) ---")
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
+    response = client.chat(
         messages=[
             {"role": "system", "content": "Answer with a number only if you are certain. If not, respond 'Unknown'."},
             {"role": "user", "content": "How many moons does Earth have?"}
@@ -113,3 +109,4 @@ if __name__ == "__main__":
     citation_example()
     refusal_policy_example()
     validation_example()
+    print("\n" + client.format_summary())
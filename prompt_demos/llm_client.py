@@ -0,0 +1,128 @@
+"""
+Shared OpenAI client for the prompt demos.
+
+One pooled HTTP connection pool reused across calls, per-call timeouts, retries with
+exponential backoff and jitter on rate limits (429), server errors (5xx), timeouts and
+dropped connections, plus latency and token usage recorded for every call.
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from openai import (APIConnectionError, APITimeoutError, DefaultHttpxClient, InternalServerError, OpenAI,
+                    RateLimitError)
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Worth retrying: the same request may well succeed a moment later
+RETRYABLE_ERRORS = (RateLimitError, InternalServerError, APITimeoutError, APIConnectionError)
+
+
+class LLMClient:
+    """Wrapper around one OpenAI client; `chat()` takes chat.completions.create arguments."""
+
+    def __init__(self, timeout=30.0, connect_timeout=5.0, max_retries=4, base_delay=0.5, max_delay=20.0,
+                 max_connections=20, max_keepalive_connections=10, client=None):
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # Kept-alive connections skip the TCP/TLS handshake on every call after the first;
+        # retries are done here (with jitter and metrics), so the SDK's own retry loop is off
+        self.client = client or OpenAI(
+            timeout=self.timeout,
+            max_retries=0,
+            http_client=DefaultHttpxClient(limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=30.0,
+            )),
+        )
+        # One dict per call: model, latency_s, attempts, prompt_tokens, completion_tokens, error
+        self.metrics = []
+
+    def _delay(self, attempt, error):
+        # Full jitter keeps a burst of rate-limited callers from retrying in lockstep
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            return max(delay, float(retry_after)) if retry_after else delay
+        except ValueError:
+            return delay
+
+    def chat(self, timeout=None, **kwargs):
+        """chat.completions.create with retries; `timeout` (seconds) overrides the default for this call."""
+        kwargs.setdefault("model", DEFAULT_MODEL)
+        started = time.perf_counter()
+        record = {"model": kwargs["model"], "attempts": 0, "prompt_tokens": None, "completion_tokens": None,
+                  "error": None}
+        try:
+            for attempt in range(self.max_retries + 1):
+                record["attempts"] = attempt + 1
+                try:
+                    response = self.client.chat.completions.create(timeout=timeout or self.timeout, **kwargs)
+                    break
+                except RETRYABLE_ERRORS as e:
+                    if attempt == self.max_retries:
+                        raise
+                    time.sleep(self._delay(attempt, e))
+            if response.usage is not None:
+                record["prompt_tokens"] = response.usage.prompt_tokens
+                record["completion_tokens"] = response.usage.completion_tokens
+            return response
+        except Exception as e:
+            record["error"] = type(e).__name__
+            raise
+        finally:
+            record["latency_s"] = time.perf_counter() - started
+            self.metrics.append(record)
+
+    def get_response(self, prompt, **kwargs):
+        """Answer text for a single user prompt, or "Error: ..." if the call failed."""
+        try:
+            response = self.chat(messages=[{"role": "user", "content": prompt}], **kwargs)
+            return response.choices[0].message.content
+        except Exception as e:
+            return f"Error: {str(e)}"
+
+    def get_responses(self, prompts, max_workers=8, **kwargs):
+        """get_response for many prompts at once over the shared connection pool, in input order."""
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(lambda prompt: self.get_response(prompt, **kwargs), prompts))
+
+    def summary(self):
+        """Totals over all calls so far: calls, errors, retries, tokens and latency."""
+        latencies = sorted(record["latency_s"] for record in self.metrics)
+        return {
+            "calls": len(self.metrics),
+            "errors": sum(record["error"] is not None for record in self.metrics),
+            "retries": sum(record["attempts"] - 1 for record in self.metrics),
+            "prompt_tokens": sum(record["prompt_tokens"] or 0 for record in self.metrics),
+            "completion_tokens": sum(record["completion_tokens"] or 0 for record in self.metrics),
+            "p50_latency_s": latencies[len(latencies) // 2] if latencies else 0.0,
+            "max_latency_s": latencies[-1] if latencies else 0.0,
+        }
+
+    def format_summary(self):
+        s = self.summary()
+        return (f"LLM calls: {s['calls']} ({s['errors']} failed, {s['retries']} retries), "
+                f"tokens: {s['prompt_tokens']} prompt + {s['completion_tokens']} completion, "
+                f"latency p50 {s['p50_latency_s']:.2f}s / max {s['max_latency_s']:.2f}s")
+
+
+_shared = None
+
+
+def get_client():
+    """The process-wide LLMClient, created on first use."""
+    global _shared
+    if _shared is None:
+        _shared = LLMClient()
+    return _shared
+
+
+def get_response(prompt, **kwargs):
+    return get_client().get_response(prompt, **kwargs)
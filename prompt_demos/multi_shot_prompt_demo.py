@@ -2,21 +2,7 @@
 Multi-Shot Prompting Demo: Zero-Shot vs Few-Shot Examples
 """
 
-from openai import OpenAI
-
-client = OpenAI()
-
-
-def get_response(prompt):
-    """Get AI response with error handling"""
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        return f"Error: {str(e)}"
+from llm_client import get_client, get_response
 
 # Poor prompt
 # ZERO-SHOT (No Examples) - Less reliable
@@ -66,8 +52,8 @@ test_cases = [
     "Standard packaging, received as expected."
 ]
 
-for i, test_text in enumerate(test_cases, 1):
-    test_prompt = f"""Classify sentiment as Positive, Negative, or Neutral:
+def consistency_prompt(test_text):
+    return f"""Classify sentiment as Positive, Negative, or Neutral:
 
 Examples:
 "I love it!" → Positive
@@ -77,12 +63,18 @@ Examples:
 Text: "{test_text}"
 Sentiment: ?"""
 
+
+# All test prompts are sent at once over the shared connection pool
+results = get_client().get_responses([consistency_prompt(test_text) for test_text in test_cases])
+for i, (test_text, result) in enumerate(zip(test_cases, results), 1):
     print(f"Test {i}: {test_text}")
-    print(f"Result: {get_response(test_prompt)}\n")
+    print(f"Result: {result}\n")
 
 print("=" * 60)
 print("KEY BENEFITS OF FEW-SHOT PROMPTING:")
 print("• More consistent and predictable results")
 print("• Shows desired output format clearly")
 print("• Reduces ambiguity in complex tasks")
-print("• Better performance on nuanced classifications")
\ No newline at end of file
+print("• Better performance on nuanced classifications")
+
+print("\n" + get_client().format_summary())
@@ -5,10 +5,11 @@ Shows how AI models can use external tools for real-time data
 
 import requests
 import json
-from openai import OpenAI
 
-# Initialize OpenAI client
-client = OpenAI()
+from llm_client import get_client
+
+# Shared pooled OpenAI client (timeouts, retries, per-call metrics)
+client = get_client()
 
 
 def get_weather(city):
@@ -92,8 +93,7 @@ def chat_with_tools(user_message):
     print(f"🗨️  User: {user_message}")
 
     # Call OpenAI with tools
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
+    response = client.chat(
         messages=[{"role": "user", "content": user_message}],
         tools=tools,
         tool_choice="auto"
@@ -118,8 +118,7 @@ def chat_with_tools(user_message):
             print(f"   Tool result: {result}")
 
             # Send tool result back to AI
-            final_response = client.chat.completions.create(
-                model="gpt-4o-mini",
+            final_response = client.chat(
                 messages=[
                     {"role": "user", "content": user_message},
                     message,
@@ -152,6 +151,8 @@ def main():
         chat_with_tools(query)
         print("-" * 40)
 
+    print(client.format_summary())
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
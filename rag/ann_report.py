@@ -0,0 +1,69 @@
+"""
+Recall@k, latency and memory of the approximate (IVF) and quantized (int8 / binary)
+vector stores against exact search.
+
+Uses synthetic clustered embeddings so it runs at any corpus size without the encoder:
+    python ann_report.py --size 200000 --dim 384 --top-k 5
+"""
+
+import argparse
+import time
+import numpy as np
+
+from vector_store import IVFVectorStore, MatrixVectorStore, QuantizedVectorStore, recall_at_k
+
+
+def synthetic_embeddings(n, dim, n_clusters=256, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, size=n)
+    return centers[labels] + 0.5 * rng.normal(size=(n, dim)).astype(np.float32)
+
+
+def mean_latency_ms(store, queries, top_k):
+    started = time.perf_counter()
+    for query in queries:
+        store.search(query, top_k)
+    return 1000 * (time.perf_counter() - started) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--n-lists", type=int, default=None)
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    vectors = synthetic_embeddings(args.size + args.queries, args.dim)
+    corpus, queries = vectors[:args.size], vectors[args.size:]
+    ids = [f"EMP{i:07d}" for i in range(args.size)]
+
+    exact = MatrixVectorStore()
+    exact.add_batch(ids, corpus)
+    ivf = IVFVectorStore(n_lists=args.n_lists)
+    ivf.add_batch(ids, corpus)
+
+    started = time.perf_counter()
+    ivf.search(queries[0], args.top_k)  # trains centroids and builds the inverted lists
+    print(f"IVF build: {len(ivf.centroids)} lists in {time.perf_counter() - started:.2f}s")
+
+    def report(name, store):
+        recall = recall_at_k(store, exact, queries, args.top_k)
+        latency = mean_latency_ms(store, queries, args.top_k)
+        print(f"{name:<16}{recall:>12.3f}{latency:>12.3f}{store.nbytes / 2 ** 20:>12.1f}")
+
+    print(f"{'backend':<16}{'recall@' + str(args.top_k):>12}{'ms/query':>12}{'vector MB':>12}")
+    report("exact", exact)
+    for n_probe in args.n_probe:
+        ivf.n_probe = n_probe
+        report(f"ivf n_probe={n_probe}", ivf)
+    for mode in ("int8", "binary"):
+        quantized = QuantizedVectorStore(mode=mode)
+        quantized.add_batch(ids, corpus)
+        report(mode, quantized)
+
+if __name__ == "__main__":
+    main()
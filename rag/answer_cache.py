@@ -0,0 +1,107 @@
+import sqlite3
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from vector_store import MatrixVectorStore
+
+
+class SemanticAnswerCache:
+    """SQLite-backed LLM answers, looked up by question-embedding similarity.
+
+    A cached answer is reused for a new question when the two questions' embeddings have
+    cosine similarity >= threshold, the entry is younger than ttl_s, and it was generated
+    from the same context (context_key, e.g. a hash of the retrieved records and prompt
+    settings). Storing an answer replaces near-duplicates with a different context, and
+    beyond max_entries the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str, model_name: str, threshold: float = 0.95, ttl_s: float = 24 * 3600,
+                 max_entries: int = 1000):
+        self.path = path
+        self.model_name = model_name
+        self.threshold = threshold
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS answers (id INTEGER PRIMARY KEY, model TEXT NOT NULL, "
+                          "question TEXT NOT NULL, embedding BLOB NOT NULL, context_key TEXT NOT NULL, "
+                          "answer TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)")
+        self.conn.execute("DELETE FROM answers WHERE created < ?", (time.time() - ttl_s,))
+        self.conn.commit()
+
+        # Embeddings of the live entries, searched in memory; entry id -> (context_key, created)
+        self._store = MatrixVectorStore()
+        self._entries = {}
+        rows = self.conn.execute("SELECT id, embedding, context_key, created FROM answers WHERE model = ?",
+                                 (model_name,)).fetchall()
+        if rows:
+            self._store.add_batch([str(row[0]) for row in rows],
+                                  np.vstack([np.frombuffer(row[1], dtype=np.float32) for row in rows]))
+            self._entries = {str(entry_id): (context_key, created) for entry_id, _, context_key, created in rows}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _similar(self, embedding: np.ndarray, top_k: int = 8):
+        for entry_id, score in self._store.search(embedding, top_k):
+            if score < self.threshold:
+                break
+            yield entry_id
+
+    def get(self, embedding: np.ndarray, context_key: str) -> Optional[str]:
+        now = time.time()
+        for entry_id in list(self._similar(embedding)):
+            cached_context, created = self._entries[entry_id]
+            if now - created > self.ttl_s:
+                self._delete([entry_id])
+                continue
+            if cached_context != context_key:
+                continue
+            (answer,) = self.conn.execute("SELECT answer FROM answers WHERE id = ?", (int(entry_id),)).fetchone()
+            self.conn.execute("UPDATE answers SET last_used = ? WHERE id = ?", (now, int(entry_id)))
+            self.conn.commit()
+            self.hits += 1
+            return answer
+        self.misses += 1
+        return None
+
+    def put(self, question: str, embedding: np.ndarray, context_key: str, answer: str):
+        # A near-identical question answered from other (older) context is superseded
+        self._delete(list(self._similar(embedding)))
+        now = time.time()
+        embedding = np.asarray(embedding, dtype=np.float32)
+        cursor = self.conn.execute(
+            "INSERT INTO answers (model, question, embedding, context_key, answer, created, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self.model_name, question, embedding.tobytes(), context_key, answer, now, now))
+        entry_id = str(cursor.lastrowid)
+        self._store.add(entry_id, embedding)
+        self._entries[entry_id] = (context_key, now)
+        if len(self._entries) > self.max_entries:
+            stale = self.conn.execute("SELECT id FROM answers WHERE model = ? ORDER BY last_used LIMIT ?",
+                                      (self.model_name, len(self._entries) - self.max_entries)).fetchall()
+            self._delete([str(row[0]) for row in stale], commit=False)
+        self.conn.commit()
+
+    def _delete(self, entry_ids: List[str], commit: bool = True):
+        if not entry_ids:
+            return
+        self.conn.executemany("DELETE FROM answers WHERE id = ?", [(int(entry_id),) for entry_id in entry_ids])
+        if commit:
+            self.conn.commit()
+        self._store.remove(entry_ids)
+        for entry_id in entry_ids:
+            self._entries.pop(entry_id, None)
+
+    def clear(self):
+        self._delete(list(self._entries))
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.max_entries}
+
+    def close(self):
+        self.conn.close()
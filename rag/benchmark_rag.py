@@ -0,0 +1,306 @@
+"""
+Retrieval benchmark for the RAG implementations.
+
+Synthesizes employees in the employee_records.json schema at each corpus size and, per
+backend, measures ingest time, vector index memory, p50/p95/p99 query latency and
+recall@k against exact search. Results are written as JSON; with --baseline the run
+fails (exit code 1) if latency or recall regressed beyond --max-regression.
+
+    python benchmark_rag.py --sizes 1000 10000 100000 1000000
+    python benchmark_rag.py --sizes 10000 --baseline benchmark_report.json
+
+Backends: exact, ivf, int8, binary (SimpleRAGDemo stores), weaviate-standin
+(WeaviateRAGDemo against the in-process weaviate_standin), weaviate (a real local
+server). --encoder hash (default) uses a fast feature-hashing stand-in for the model
+so large sizes finish quickly; --encoder model uses all-MiniLM-L6-v2.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import zlib
+from itertools import islice
+
+import numpy as np
+
+from bm25_index import tokenize
+from rag_employee_inmemory import MODEL_NAME, SimpleRAGDemo
+
+DEPARTMENTS = {
+    "Engineering": (["Software Engineer", "Senior Software Engineer", "DevOps Engineer", "Data Engineer"],
+                    ["Python", "Java", "Machine Learning", "AWS", "Docker", "Kubernetes", "SQL", "React"]),
+    "Marketing": (["Digital Marketing Manager", "Content Strategist", "Marketing Analyst"],
+                  ["SEO", "Google Analytics", "Social Media Marketing", "Content Strategy", "Copywriting"]),
+    "Sales": (["Sales Representative", "Account Executive", "Sales Manager"],
+              ["Negotiation", "CRM", "Salesforce", "Lead Generation", "Client Relations"]),
+    "Human Resources": (["HR Business Partner", "Recruiter", "HR Generalist"],
+                        ["Employee Relations", "Talent Acquisition", "Performance Management", "Employment Law"]),
+    "Finance": (["Financial Analyst", "Accountant", "Finance Manager"],
+                ["Excel", "Financial Modeling", "SQL", "Tableau", "Budget Analysis", "Forecasting"]),
+    "Product": (["Product Manager", "Product Owner", "UX Researcher"],
+                ["Roadmapping", "User Research", "Agile", "Jira", "A/B Testing"]),
+}
+FIRST_NAMES = ["Sarah", "Marcus", "Emily", "Alex", "Maria", "James", "Priya", "Chen", "Olivia", "Ahmed", "Laura", "Diego"]
+LAST_NAMES = ["Johnson", "Rodriguez", "Watson", "Thompson", "Gonzalez", "Wilson", "Patel", "Li", "Brown", "Khan"]
+LOCATIONS = ["San Francisco", "New York", "Austin", "Chicago", "Denver", "Seattle", "Boston", "Remote"]
+RATINGS = ["Outstanding", "Exceeds Expectations", "Meets Expectations", "Needs Improvement"]
+CERTIFICATIONS = ["AWS Solutions Architect", "Kubernetes Administrator", "PMP", "CFA Level 1", "SHRM-CP",
+                  "Google Analytics Certified", "Scrum Master", "Salesforce Administrator"]
+PROJECT_TOPICS = ["Cloud Migration", "Customer Portal", "Brand Awareness Campaign", "Cost Reduction Initiative",
+                  "Diversity & Inclusion Initiative", "Data Platform", "Mobile App Backend", "Quarterly Forecast"]
+NOTES = ["Top performer", "mentors junior staff", "strong analytical skills", "excellent client relationships",
+         "quick learner", "leads cross-team initiatives", "detail-oriented", "great communicator"]
+QUESTION_TEMPLATES = ["Who has {skill} skills?", "Find someone in {department} with {skill} experience",
+                      "Who is a {position} in {location}?", "Do we have anyone certified as {certification}?"]
+
+
+def synthesize_employees(n, seed=0):
+    rng = random.Random(seed)
+    for i in range(n):
+        department = rng.choice(list(DEPARTMENTS))
+        positions, skills = DEPARTMENTS[department]
+        hire_year = rng.randint(2012, 2024)
+        yield {
+            "employee_id": f"EMP{i:07d}",
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "department": department,
+            "position": rng.choice(positions),
+            "hire_date": f"{hire_year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "salary": rng.randrange(50000, 200000, 1000),
+            "performance_rating": rng.choice(RATINGS),
+            "skills": rng.sample(skills, rng.randint(2, min(5, len(skills)))),
+            "projects": [f"{rng.choice(PROJECT_TOPICS)} ({rng.randint(hire_year, 2024)})" for _ in range(rng.randint(1, 3))],
+            "manager": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "location": rng.choice(LOCATIONS),
+            "certifications": rng.sample(CERTIFICATIONS, rng.randint(0, 2)),
+            "training_completed": [f"{rng.choice(skills)} Workshop ({rng.randint(hire_year, 2024)})"],
+            "last_promotion": f"{rng.randint(hire_year, 2024)}-{rng.randint(1, 12):02d}-01" if rng.random() < 0.6 else None,
+            "notes": ", ".join(rng.sample(NOTES, 2)).capitalize(),
+        }
+
+
+def synthesize_questions(n, seed=1):
+    rng = random.Random(seed)
+    questions = []
+    for _ in range(n):
+        department = rng.choice(list(DEPARTMENTS))
+        positions, skills = DEPARTMENTS[department]
+        questions.append(rng.choice(QUESTION_TEMPLATES).format(
+            skill=rng.choice(skills), department=department, position=rng.choice(positions),
+            location=rng.choice(LOCATIONS), certification=rng.choice(CERTIFICATIONS)))
+    return questions
+
+
+class HashingEncoder:
+    """Fast deterministic stand-in for the sentence encoder: signed feature hashing of tokens."""
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def encode(self, texts, batch_size=32, **_):
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                h = zlib.crc32(token.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return vectors[0] if single else vectors
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def load_weaviate_demo():
+    # The module name has a hyphen, so it cannot be imported normally
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "weaviate_rag-openai.py")
+    spec = importlib.util.spec_from_file_location("weaviate_rag_openai", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.WeaviateRAGDemo
+
+
+def build_backend(backend, encoder):
+    if backend in ("exact", "ivf", "int8", "binary"):
+        return SimpleRAGDemo(cache_path=None, vector_index=backend, query_cache_size=0, encoder=encoder)
+    WeaviateRAGDemo = load_weaviate_demo()
+    # openai_client is never used by ingestion or search, so a placeholder avoids needing an API key
+    if backend == "weaviate-standin":
+        from weaviate_standin import StandInClient
+        return WeaviateRAGDemo(cache_path=None, answer_cache_path=None, query_cache_size=0, encoder=encoder,
+                               client=StandInClient(), openai_client=object())
+    if backend == "weaviate":
+        return WeaviateRAGDemo(cache_path=None, answer_cache_path=None, query_cache_size=0, encoder=encoder,
+                               openai_client=object())
+    raise ValueError(f"Unknown backend '{backend}'")
+
+
+STORE_BACKENDS = ("exact", "ivf", "int8", "binary")
+
+
+def result_ids(rag, question, top_k):
+    return [result["employee_id"] for result in rag.search_employees(question, top_k=top_k)]
+
+
+def recall_with_ties(exact_store, query_vectors, answers, top_k):
+    """recall@k where any result scoring at least the exact k-th score counts as a hit.
+
+    Synthetic records contain many identical texts, so plain id overlap would punish
+    approximate backends for picking a different member of a tie.
+    """
+    hits = total = 0
+    for query, found in zip(query_vectors, answers):
+        expected = exact_store.search(query, top_k)
+        if not expected:
+            continue
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        scores = exact_store.matrix[exact_store.rows_for(found)] @ query
+        hits += int((scores >= expected[-1][1] - 1e-5).sum())
+        total += len(expected)
+    return hits / max(1, total)
+
+
+def run_backend(backend, size, questions, top_k, encoder, trace_memory):
+    rag = build_backend(backend, encoder)
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    for chunk in chunks(synthesize_employees(size), 10000):
+        rag.create_employee_embeddings(chunk, batch_size=256, show_progress=False)
+    ingest_seconds = time.perf_counter() - started
+    traced_bytes = None
+    if trace_memory:
+        traced_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+    for question in questions[:5]:  # warm-up (IVF training, lazy structures)
+        rag.search_employees(question, top_k=top_k)
+    latencies = []
+    answers = []
+    for question in questions:
+        started = time.perf_counter()
+        answers.append(result_ids(rag, question, top_k))
+        latencies.append(1000 * (time.perf_counter() - started))
+
+    store = getattr(rag, "vector_store", None)
+    row = {
+        "backend": backend,
+        "size": size,
+        "ingest_seconds": round(ingest_seconds, 3),
+        "ingest_records_per_sec": round(size / ingest_seconds, 1),
+        "vector_bytes": store.nbytes if store is not None else None,
+        "traced_bytes": traced_bytes,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "recall_at_k": None,
+    }
+    return row, answers, rag
+
+
+def find_regressions(rows, baseline_rows, max_regression):
+    baseline = {(row["backend"], row["size"]): row for row in baseline_rows}
+    problems = []
+    for row in rows:
+        before = baseline.get((row["backend"], row["size"]))
+        if before is None:
+            continue
+        if before["p95_ms"] and row["p95_ms"] > before["p95_ms"] * (1 + max_regression):
+            problems.append(f"{row['backend']}@{row['size']}: p95 {before['p95_ms']}ms -> {row['p95_ms']}ms")
+        if before["recall_at_k"] is not None and row["recall_at_k"] is not None \
+                and row["recall_at_k"] < before["recall_at_k"] - max_regression * (1 - before["recall_at_k"]) - 1e-9:
+            problems.append(f"{row['backend']}@{row['size']}: recall {before['recall_at_k']} -> {row['recall_at_k']}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--backends", nargs="+", default=["exact", "ivf", "int8", "binary", "weaviate-standin"])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--encoder", choices=["hash", "model"], default="hash")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also report Python-traced bytes after ingest (slows ingest down)")
+    parser.add_argument("--output", default="benchmark_report.json")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="allowed relative p95 increase / share of recall gap lost (default 0.2)")
+    args = parser.parse_args()
+
+    if args.encoder == "model":
+        from encoder_registry import get_encoder
+        encoder = get_encoder(MODEL_NAME)
+    else:
+        encoder = HashingEncoder()
+    questions = synthesize_questions(args.queries)
+
+    # Each family's exact reference runs first so the others can be scored against it:
+    # exact for the SimpleRAGDemo stores, weaviate-standin (exact NumPy) for real Weaviate,
+    # since the Weaviate demo embeds a differently rendered record text
+    order = ["exact"] + [b for b in STORE_BACKENDS[1:] if b in args.backends] + \
+            [b for b in ("weaviate-standin", "weaviate") if b in args.backends]
+    rows = []
+    print(f"{'backend':<18}{'size':>9}{'ingest/s':>11}{'vector MB':>11}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'recall':>8}")
+    for size in args.sizes:
+        reference = None
+        weaviate_truth = None
+        query_vectors = encoder.encode(questions)
+        for backend in order:
+            row, answers, rag = run_backend(backend, size, questions, args.top_k, encoder, args.trace_memory)
+            if backend == "exact":
+                reference = rag
+                row["recall_at_k"] = 1.0
+            elif backend in STORE_BACKENDS:
+                row["recall_at_k"] = round(recall_with_ties(reference.vector_store, query_vectors, answers,
+                                                            args.top_k), 4)
+            elif backend == "weaviate-standin":
+                weaviate_truth = answers
+                row["recall_at_k"] = 1.0
+            elif weaviate_truth is not None:
+                hits = sum(len(set(found) & set(expected)) for found, expected in zip(answers, weaviate_truth))
+                row["recall_at_k"] = round(hits / max(1, sum(map(len, weaviate_truth))), 4)
+            if backend.startswith("weaviate"):
+                rag.client.close()
+            if backend == "exact" and "exact" not in args.backends:
+                continue
+            rows.append(row)
+            vector_mb = "-" if row["vector_bytes"] is None else f"{row['vector_bytes'] / 2 ** 20:.1f}"
+            recall = "-" if row["recall_at_k"] is None else f"{row['recall_at_k']:.3f}"
+            print(f"{backend:<18}{size:>9}{row['ingest_records_per_sec']:>11.0f}{vector_mb:>11}"
+                  f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}{recall:>8}")
+
+    report = {
+        "encoder": args.encoder,
+        "top_k": args.top_k,
+        "queries": args.queries,
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "results": rows,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = find_regressions(rows, json.load(f)["results"], args.max_regression)
+        for problem in problems:
+            print("REGRESSION:", problem)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import heapq
+import json
+import math
+import os
+import re
+from collections import Counter
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Small in-memory inverted index with Okapi BM25 scoring."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._doc_lengths)
+
+    def add(self, doc_id: str, text: str):
+        if doc_id in self._doc_lengths:
+            self.remove([doc_id])
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+        length = sum(counts.values())
+        self._doc_lengths[doc_id] = length
+        self._doc_terms[doc_id] = list(counts)
+        self._total_length += length
+
+    def remove(self, doc_ids: Iterable[str]):
+        for doc_id in doc_ids:
+            if doc_id not in self._doc_lengths:
+                continue
+            for term in self._doc_terms.pop(doc_id):
+                posting = self._postings[term]
+                del posting[doc_id]
+                if not posting:
+                    del self._postings[term]
+            self._total_length -= self._doc_lengths.pop(doc_id)
+
+    def search(self, query: str, top_k: int = 10, candidate_ids: Set[str] | None = None) -> List[Tuple[str, float]]:
+        n_docs = len(self._doc_lengths)
+        if not n_docs or top_k <= 0:
+            return []
+        avg_length = self._total_length / n_docs
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_id, tf in posting.items():
+                if candidate_ids is not None and doc_id not in candidate_ids:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    def save(self, directory: str, ids: List[str]):
+        """Write the postings as flat arrays; documents are stored as their row in `ids`."""
+        row_of = {doc_id: row for row, doc_id in enumerate(ids)}
+        terms = list(self._postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        rows, tfs = [], []
+        for t, term in enumerate(terms):
+            posting = self._postings[term]
+            rows.extend(row_of[doc_id] for doc_id in posting)
+            tfs.extend(posting.values())
+            offsets[t + 1] = len(rows)
+        lengths = np.array([self._doc_lengths[doc_id] for doc_id in ids], dtype=np.int32)
+        with open(os.path.join(directory, "bm25_terms.json"), "w") as f:
+            json.dump(terms, f)
+        np.save(os.path.join(directory, "bm25_offsets.npy"), offsets)
+        np.save(os.path.join(directory, "bm25_rows.npy"), np.array(rows, dtype=np.int32))
+        np.save(os.path.join(directory, "bm25_tfs.npy"), np.array(tfs, dtype=np.int32))
+        np.save(os.path.join(directory, "bm25_lengths.npy"), lengths)
+
+    @classmethod
+    def load(cls, directory: str, ids: List[str], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """Read-only index over the memory-mapped arrays written by save(); postings are
+        decoded per query term, so loading does not depend on the corpus size."""
+        index = cls(k1, b)
+        with open(os.path.join(directory, "bm25_terms.json")) as f:
+            terms = json.load(f)
+        lengths = np.load(os.path.join(directory, "bm25_lengths.npy"))
+        index._postings = _PostingsView(terms, np.load(os.path.join(directory, "bm25_offsets.npy"), mmap_mode="r"),
+                                        np.load(os.path.join(directory, "bm25_rows.npy"), mmap_mode="r"),
+                                        np.load(os.path.join(directory, "bm25_tfs.npy"), mmap_mode="r"), ids)
+        index._doc_lengths = dict(zip(ids, lengths.tolist()))
+        index._total_length = sum(index._doc_lengths.values())
+        return index
+
+
+class _PostingsView(Mapping):
+    """term -> {doc_id: tf}, decoded on access from BM25Index.save() arrays."""
+
+    def __init__(self, terms, offsets, rows, tfs, ids):
+        self._term_index = {term: t for t, term in enumerate(terms)}
+        self._offsets = offsets
+        self._rows = rows
+        self._tfs = tfs
+        self._ids = ids
+
+    def __getitem__(self, term: str) -> Dict[str, int]:
+        t = self._term_index[term]
+        start, end = self._offsets[t], self._offsets[t + 1]
+        return dict(zip([self._ids[row] for row in self._rows[start:end].tolist()], self._tfs[start:end].tolist()))
+
+    def __iter__(self):
+        return iter(self._term_index)
+
+    def __len__(self):
+        return len(self._term_index)
+
+
+def reciprocal_rank_fusion(rankings: List[List[Tuple[str, float]]], k: int = 60) -> List[Tuple[str, float]]:
+    """Merge ranked lists by summing 1 / (k + rank); robust to the lists' different score scales."""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, (doc_id, _) in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
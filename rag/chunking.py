@@ -0,0 +1,57 @@
+from typing import Dict, Iterable, List, Tuple
+
+# Separates the employee_id from the chunk number in vector ids: "EMP001#2"
+CHUNK_SEPARATOR = "#"
+
+
+def chunk_id(emp_id: str, index: int) -> str:
+    return f"{emp_id}{CHUNK_SEPARATOR}{index}"
+
+
+def parent_id(vector_id: str) -> str:
+    return vector_id.rsplit(CHUNK_SEPARATOR, 1)[0]
+
+
+def sliding_windows(text: str, window_words: int = 96, stride_words: int = 64) -> List[str]:
+    """Overlapping windows of at most window_words words.
+
+    all-MiniLM-L6-v2 truncates its input at 256 word pieces; 96 words stay well below that,
+    and the overlap keeps a sentence that straddles two windows whole in one of them.
+    """
+    words = text.split()
+    if len(words) <= window_words:
+        return [text] if words else []
+    starts = range(0, len(words) - window_words + stride_words, stride_words)
+    return [" ".join(words[start:start + window_words]) for start in starts]
+
+
+def employee_chunks(employee: Dict, window_words: int = 96, stride_words: int = 64) -> List[str]:
+    """Texts to embed for one employee: a profile chunk, one chunk per project and
+    sliding windows over the notes, each prefixed with who it is about."""
+    header = f"{employee['name']}, {employee['position']}, {employee['department']}"
+    chunks = [
+        f"""Name: {employee['name']}
+            Department: {employee['department']}
+            Position: {employee['position']}
+            Skills: {', '.join(employee['skills'])}
+            Location: {employee['location']}
+            Performance: {employee['performance_rating']}
+            Certifications: {', '.join(employee['certifications'])}"""
+    ]
+    chunks += [f"{header}. Project: {project}" for project in employee['projects']]
+    chunks += [f"{header}. Notes: {window}"
+               for window in sliding_windows(employee['notes'], window_words, stride_words)]
+    return chunks
+
+
+def max_per_parent(chunk_matches: Iterable[Tuple[str, float]], top_k: int) -> List[Tuple[str, float]]:
+    """Collapse (chunk id, score) matches, best first, into the top_k (employee_id, best chunk score)."""
+    best = {}
+    for vector_id, score in chunk_matches:
+        parent = parent_id(vector_id)
+        # Matches arrive best first, so the first chunk seen is the parent's maximum
+        if parent not in best:
+            best[parent] = score
+            if len(best) == top_k:
+                break
+    return list(best.items())
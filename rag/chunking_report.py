@@ -0,0 +1,83 @@
+"""
+Cost and benefit of chunked (multi-vector) indexing in SimpleRAGDemo.
+
+Synthesizes employees with long notes and, for chunking off and on, reports the number
+of vectors, vector memory, ingest time and query latency. It also reports how often a
+fact planted at the end of the notes brings that employee into the top-k. With the real
+model (--encoder model) that fact lies past MiniLM's 256-token limit in the one-vector index:
+    python chunking_report.py --size 5000 --note-words 300 --encoder model
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from benchmark_rag import FIRST_NAMES, LOCATIONS, NOTES, HashingEncoder, synthesize_employees
+from rag_employee_inmemory import MODEL_NAME, SimpleRAGDemo
+
+EVENTS = ["charity run", "hackathon", "book club", "chess tournament", "food drive", "coding dojo"]
+
+
+def employees_with_long_notes(size, note_words, seed=0):
+    """Employees whose notes are padded to about note_words words and end with a unique fact."""
+    rng = random.Random(seed)
+    employees, facts = [], {}
+    for employee in synthesize_employees(size, seed):
+        words = employee["notes"].split()
+        while len(words) < note_words:
+            words += f"{rng.choice(NOTES).capitalize()}.".split()
+        fact = f"organised the {rng.choice(LOCATIONS)} {rng.choice(EVENTS)} with {rng.choice(FIRST_NAMES)} " \
+               f"in {rng.randint(1990, 2024)}"
+        employee["notes"] = " ".join(words) + f" Also {fact}."
+        facts[employee["employee_id"]] = fact
+        employees.append(employee)
+    return employees, facts
+
+
+def run(chunking, employees, questions, top_k, encoder):
+    rag = SimpleRAGDemo(cache_path=None, encoder=encoder, query_cache_size=0, chunking=chunking)
+    started = time.perf_counter()
+    rag.create_employee_embeddings(employees, show_progress=False)
+    ingest_s = time.perf_counter() - started
+    query_vectors = rag.encode_queries([question for _, question in questions])
+
+    latencies, hits = [], 0
+    for (emp_id, _), query_vector in zip(questions, query_vectors):
+        started = time.perf_counter()
+        matches = rag._vector_search(query_vector, top_k)
+        latencies.append(time.perf_counter() - started)
+        hits += any(match_id == emp_id for match_id, _ in matches)
+    latencies = 1000 * np.array(latencies)
+    store = rag.vector_store
+    return (f"{'on' if chunking else 'off':<10}{len(store):>10}{store.nbytes / 2 ** 20:>11.1f}{ingest_s:>10.1f}"
+            f"{np.percentile(latencies, 50):>9.2f}{np.percentile(latencies, 95):>9.2f}{hits / len(questions):>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=5000)
+    parser.add_argument("--note-words", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--encoder", choices=["hash", "model"], default="hash")
+    args = parser.parse_args()
+
+    if args.encoder == "model":
+        from encoder_registry import get_encoder
+        encoder = get_encoder(MODEL_NAME)
+    else:
+        encoder = HashingEncoder()
+    employees, facts = employees_with_long_notes(args.size, args.note_words)
+    sample = random.Random(1).sample(sorted(facts), min(args.queries, len(facts)))
+    questions = [(emp_id, f"Who {facts[emp_id]}?") for emp_id in sample]
+
+    print(f"{'chunking':<10}{'vectors':>10}{'vector MB':>11}{'ingest s':>10}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'fact hit':>10}")
+    for chunking in (False, True):
+        print(run(chunking, employees, questions, args.top_k, encoder))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import re
+from typing import Dict, List, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Loaded on first use: the first get_encoding() may download the BPE file. False once that failed
+_encoding = None
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+# Fields in the order they are worth spending tokens on; the first three identify the employee
+HEADER_FIELDS = ("name", "position", "department")
+DETAIL_FIELDS = ("skills", "certifications", "projects", "location", "performance_rating", "notes")
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        _encoding = False
+        if tiktoken is not None:
+            try:
+                # gpt-4o / gpt-4o-mini tokenizer
+                _encoding = tiktoken.get_encoding("o200k_base")
+            except Exception:
+                pass
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Token count under the chat model's tokenizer (tiktoken), or a word/punctuation estimate when
+    tiktoken is missing or its encoding can't be loaded (e.g. offline)."""
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text))
+    return len(_WORD_RE.findall(text))
+
+
+def _render(parts: List[Tuple[str, str | List[str]]]) -> str:
+    header = ", ".join(value for field, value in parts if field in HEADER_FIELDS)
+    details = "; ".join(f"{field.replace('_', ' ')}: {', '.join(value) if isinstance(value, list) else value}"
+                        for field, value in parts if field not in HEADER_FIELDS)
+    return f"{header}; {details}" if details else header
+
+
+def pack_context(employees: List[Dict], token_budget: int) -> Tuple[str, int]:
+    """Greedily fill `token_budget` tokens with the most useful parts of the retrieved employees.
+
+    `employees` is in relevance order. First the identifying fields of as many employees as fit,
+    then each detail field in DETAIL_FIELDS order, best-ranked employee first; list fields are packed
+    item by item. Returns (context, token count); one line per employee.
+    """
+    # Running total: each added piece (a line, a field, a list item) is counted with its separator,
+    # instead of re-counting the whole context after every addition
+    records = []
+    used = 0
+    for employee in employees:
+        parts = [(field, str(employee[field])) for field in HEADER_FIELDS if employee.get(field)]
+        if not parts:
+            continue
+        cost = count_tokens(("\n" if records else "") + ", ".join(value for _, value in parts))
+        if used + cost > token_budget:
+            break
+        records.append((employee, parts))
+        used += cost
+
+    for field in DETAIL_FIELDS:
+        label = field.replace('_', ' ')
+        for employee, parts in records:
+            value = employee.get(field)
+            if not value:
+                continue
+            if isinstance(value, list):
+                items = []
+                for item in map(str, value):
+                    cost = count_tokens(f", {item}" if items else f"; {label}: {item}")
+                    if used + cost > token_budget:
+                        break
+                    items.append(item)
+                    used += cost
+                if items:
+                    parts.append((field, items))
+            else:
+                cost = count_tokens(f"; {label}: {value}")
+                if used + cost <= token_budget:
+                    parts.append((field, str(value)))
+                    used += cost
+
+    context = "\n".join(_render(parts) for _, parts in records)
+    return context, count_tokens(context)
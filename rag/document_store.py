@@ -0,0 +1,137 @@
+import sys
+from array import array
+from collections.abc import MutableMapping
+from typing import Dict
+
+# Sentinels for a field the record does not have
+_MISSING = -(1 << 63)
+_ABSENT = object()
+
+
+class CompactDocumentStore(MutableMapping):
+    """Columnar employee_id -> record store.
+
+    Repeated strings (department, location, position, ...) are stored once and
+    referenced by an integer code, integer fields live in typed arrays, and list
+    fields become tuples of interned strings. A record dict is only built when it
+    is read, so every lookup returns a fresh dict the caller may modify.
+    """
+
+    CATEGORICAL_FIELDS = ("department", "position", "performance_rating", "manager", "location")
+    INTEGER_FIELDS = ("salary",)
+    LIST_FIELDS = ("skills", "projects", "certifications", "training_completed")
+    TEXT_FIELDS = ("name", "hire_date", "last_promotion", "notes")
+    # Field order of employee_records.json, used when materializing
+    FIELD_ORDER = ("employee_id", "name", "department", "position", "hire_date", "salary", "performance_rating",
+                   "skills", "projects", "manager", "location", "certifications", "training_completed",
+                   "last_promotion", "notes")
+
+    def __init__(self):
+        self._row_of: Dict[str, int] = {}
+        self._ids = []
+        self._vocab = {field: [] for field in self.CATEGORICAL_FIELDS}
+        self._vocab_codes = {field: {} for field in self.CATEGORICAL_FIELDS}
+        self._codes = {field: array("I") for field in self.CATEGORICAL_FIELDS}
+        self._integers = {field: array("q") for field in self.INTEGER_FIELDS}
+        self._columns = {field: [] for field in self.LIST_FIELDS + self.TEXT_FIELDS}
+        # Fields outside the schema (or values that do not fit their column), per row
+        self._extras = []
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __contains__(self, emp_id):
+        return emp_id in self._row_of
+
+    def _code(self, field: str, value) -> int:
+        codes = self._vocab_codes[field]
+        if value not in codes:
+            codes[value] = len(self._vocab[field])
+            self._vocab[field].append(value)
+        return codes[value]
+
+    def __setitem__(self, emp_id: str, employee: Dict):
+        row = self._row_of.get(emp_id)
+        if row is None:
+            row = len(self._ids)
+            self._row_of[emp_id] = row
+            self._ids.append(emp_id)
+            for column in self._codes.values():
+                column.append(0)
+            for column in self._integers.values():
+                column.append(_MISSING)
+            for column in self._columns.values():
+                column.append(_ABSENT)
+            self._extras.append(None)
+
+        extras = {}
+        for field in self.CATEGORICAL_FIELDS:
+            # Code 0 is reserved for "field not present"; only strings are coded (a list or number, which
+            # may not be hashable or may compare equal to another type, is kept as is in the extras)
+            value = employee.get(field, _ABSENT)
+            self._codes[field][row] = self._code(field, value) + 1 if isinstance(value, str) else 0
+            if value is not _ABSENT and not isinstance(value, str):
+                extras[field] = value
+        for field in self.INTEGER_FIELDS:
+            value = employee.get(field, _ABSENT)
+            if isinstance(value, int) and not isinstance(value, bool) and value != _MISSING:
+                self._integers[field][row] = value
+            else:
+                self._integers[field][row] = _MISSING
+                if value is not _ABSENT:
+                    extras[field] = value
+        for field in self.LIST_FIELDS:
+            value = employee.get(field, _ABSENT)
+            if isinstance(value, list) and all(isinstance(item, str) for item in value):
+                self._columns[field][row] = tuple(sys.intern(item) for item in value)
+            else:
+                self._columns[field][row] = _ABSENT
+                if value is not _ABSENT:
+                    extras[field] = value
+        for field in self.TEXT_FIELDS:
+            value = employee.get(field, _ABSENT)
+            # Dates repeat a lot across employees, so share one string object per value
+            self._columns[field][row] = sys.intern(value) if field.endswith("date") and isinstance(value, str) else value
+        for field, value in employee.items():
+            if field not in self.FIELD_ORDER:
+                extras[field] = value
+        self._extras[row] = extras or None
+
+    def __getitem__(self, emp_id: str) -> Dict:
+        row = self._row_of[emp_id]
+        employee = {}
+        for field in self.FIELD_ORDER:
+            if field == "employee_id":
+                employee[field] = emp_id
+            elif field in self._codes:
+                code = self._codes[field][row]
+                if code:
+                    employee[field] = self._vocab[field][code - 1]
+            elif field in self._integers:
+                value = self._integers[field][row]
+                if value != _MISSING:
+                    employee[field] = value
+            else:
+                value = self._columns[field][row]
+                if value is not _ABSENT:
+                    employee[field] = list(value) if field in self.LIST_FIELDS else value
+        if self._extras[row]:
+            employee.update(self._extras[row])
+        return employee
+
+    def __delitem__(self, emp_id: str):
+        row = self._row_of.pop(emp_id)
+        last = len(self._ids) - 1
+        # Move the last row into the hole so the columns stay dense
+        columns = list(self._codes.values()) + list(self._integers.values()) + list(self._columns.values())
+        columns.append(self._extras)
+        for column in columns:
+            column[row] = column[last]
+            column.pop()
+        moved_id = self._ids.pop()
+        if row != last:
+            self._ids[row] = moved_id
+            self._row_of[moved_id] = row
@@ -0,0 +1,43 @@
+import json
+import mmap
+import os
+from collections.abc import Mapping
+from typing import Dict
+
+import numpy as np
+
+
+def write_document_table(directory: str, ids, documents: Dict[str, Dict]):
+    """Write records as JSON Lines (in `ids` order) plus an int64 array of line offsets."""
+    offsets = np.empty(len(ids) + 1, dtype=np.int64)
+    with open(os.path.join(directory, "documents.jsonl"), "wb") as f:
+        for row, emp_id in enumerate(ids):
+            offsets[row] = f.tell()
+            f.write(json.dumps(documents[emp_id], ensure_ascii=False).encode("utf-8") + b"\n")
+        offsets[len(ids)] = f.tell()
+    np.save(os.path.join(directory, "offsets.npy"), offsets)
+
+
+class DocumentTable(Mapping):
+    """Read-only employee_id -> record mapping over a memory-mapped JSON Lines file.
+
+    Records are only parsed when accessed, so opening a large table is near-instant
+    and several processes can share the file through the OS page cache.
+    """
+
+    def __init__(self, directory: str, ids):
+        self._row_of = {emp_id: row for row, emp_id in enumerate(ids)}
+        self._ids = list(ids)
+        self._offsets = np.load(os.path.join(directory, "offsets.npy"), mmap_mode="r")
+        self._file = open(os.path.join(directory, "documents.jsonl"), "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._offsets[-1] else b""
+
+    def __getitem__(self, emp_id: str) -> Dict:
+        row = self._row_of[emp_id]
+        return json.loads(self._data[self._offsets[row]:self._offsets[row + 1]])
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
@@ -0,0 +1,156 @@
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from typing import Dict, List, Optional
+
+
+def encode_in_batches(encoder, texts: List[str], batch_size: int = 64, show_progress: bool = True,
+                      chunk_size: Optional[int] = None) -> np.ndarray:
+    """Encode all texts in fixed-size batches and return one (n, dim) float32 array.
+
+    chunk_size is how many texts go to each encoder.encode call (default: one batch);
+    make it larger for a ParallelEncoder so every worker gets a full shard.
+    """
+    if not texts:
+        return np.empty((0, encoder.get_sentence_embedding_dimension()), dtype=np.float32)
+
+    chunks = []
+    started = time.perf_counter()
+    chunk_size = chunk_size or batch_size
+    for start in range(0, len(texts), chunk_size):
+        batch = texts[start:start + chunk_size]
+        chunks.append(np.asarray(encoder.encode(batch, batch_size=batch_size), dtype=np.float32))
+        if show_progress:
+            done = start + len(batch)
+            rate = done / max(time.perf_counter() - started, 1e-9)
+            print(f"\rEncoded {done}/{len(texts)} records ({rate:.1f} records/sec)", end="", flush=True)
+    if show_progress:
+        print()
+    return np.vstack(chunks)
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding cache keyed by a hash of the model name and the record text."""
+
+    def __init__(self, path: str, model_name: str):
+        self.path = path
+        self.model_name = model_name
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self.conn.commit()
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\n{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk)
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+            ((key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items())
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def encode_with_cache(encoder, texts: List[str], cache: Optional[EmbeddingCache] = None,
+                      batch_size: int = 64, show_progress: bool = True, chunk_size: Optional[int] = None) -> np.ndarray:
+    """Like encode_in_batches, but only texts missing from the cache are sent to the encoder."""
+    if cache is None:
+        return encode_in_batches(encoder, texts, batch_size=batch_size, show_progress=show_progress,
+                                 chunk_size=chunk_size)
+
+    keys = [cache.key(text) for text in texts]
+    cached = cache.get_many(list(set(keys)))
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in cached:
+            missing.setdefault(key, text)
+    if show_progress:
+        hits = sum(key in cached for key in keys)
+        print(f"Embedding cache: {hits} hits, {len(missing)} texts to encode")
+
+    if missing:
+        encoded = encode_in_batches(encoder, list(missing.values()), batch_size=batch_size,
+                                    show_progress=show_progress, chunk_size=chunk_size)
+        new_vectors = dict(zip(missing.keys(), encoded))
+        cache.put_many(new_vectors)
+        cached.update(new_vectors)
+
+    if not texts:
+        return np.empty((0, encoder.get_sentence_embedding_dimension()), dtype=np.float32)
+    return np.vstack([cached[key] for key in keys])
+
+
+# Model held by each ParallelEncoder worker process
+_worker_encoder = None
+
+
+def _init_worker(model_name: str, torch_threads: int):
+    global _worker_encoder
+    import torch
+    from sentence_transformers import SentenceTransformer
+    torch.set_num_threads(torch_threads)
+    _worker_encoder = SentenceTransformer(model_name, device="cpu")
+
+
+def _encode_shard(shard: List[str], batch_size: int) -> np.ndarray:
+    return np.asarray(_worker_encoder.encode(shard, batch_size=batch_size), dtype=np.float32)
+
+
+class ParallelEncoder:
+    """Drop-in for SentenceTransformer.encode that splits each call across a process pool.
+
+    Every worker loads its own copy of the model and uses `torch_threads` threads;
+    shards come back in submission order, so row i of the result is still text i.
+    """
+
+    def __init__(self, model_name: str, workers: Optional[int] = None, torch_threads: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // self.workers)
+        # spawn, not fork: forking a process that already initialized torch can deadlock
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_name, self.torch_threads),
+        )
+        self._dim = None
+
+    def encode(self, texts, batch_size: int = 32, **_) -> np.ndarray:
+        if isinstance(texts, str):
+            return self.encode([texts], batch_size=batch_size)[0]
+        if not texts:
+            return np.empty((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        shard_size = -(-len(texts) // self.workers)
+        shards = [texts[start:start + shard_size] for start in range(0, len(texts), shard_size)]
+        return np.vstack(list(self._pool.map(_encode_shard, shards, [batch_size] * len(shards))))
+
+    def get_sentence_embedding_dimension(self) -> int:
+        if self._dim is None:
+            self._dim = self.encode(["dimension probe"]).shape[1]
+        return self._dim
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
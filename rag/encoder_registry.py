@@ -0,0 +1,28 @@
+import threading
+
+# (kind, model name) -> loaded model, shared by every RAG instance in the process
+_models = {}
+_lock = threading.Lock()
+
+
+def _get(kind: str, model_name: str):
+    with _lock:
+        model = _models.get((kind, model_name))
+        if model is None:
+            import sentence_transformers
+            model = _models[(kind, model_name)] = getattr(sentence_transformers, kind)(model_name)
+        return model
+
+
+def get_encoder(model_name: str):
+    """Return the process-wide SentenceTransformer for model_name, loading it on first request.
+
+    sentence_transformers (and torch) are only imported here, so code paths that never
+    embed anything (e.g. loading a saved index's documents) skip that cost entirely.
+    """
+    return _get("SentenceTransformer", model_name)
+
+
+def get_cross_encoder(model_name: str):
+    """Return the process-wide CrossEncoder (re-ranking model) for model_name, loading it on first request."""
+    return _get("CrossEncoder", model_name)
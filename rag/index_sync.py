@@ -0,0 +1,26 @@
+import hashlib
+import json
+from typing import Dict, List, Tuple
+
+
+def employee_fingerprint(employee: Dict) -> str:
+    """Stable hash of a whole employee record, independent of key order."""
+    canonical = json.dumps(employee, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def diff_employees(indexed: Dict[str, str], employees: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    """Compare records against what is indexed (employee_id -> fingerprint).
+
+    Returns the employees that are new or changed, and the ids that are no
+    longer present in the source data.
+    """
+    upserts = []
+    seen = set()
+    for employee in employees:
+        emp_id = employee['employee_id']
+        seen.add(emp_id)
+        if indexed.get(emp_id) != employee_fingerprint(employee):
+            upserts.append(employee)
+    deletes = [emp_id for emp_id in indexed if emp_id not in seen]
+    return upserts, deletes
@@ -0,0 +1,160 @@
+import bisect
+import json
+import os
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Set
+
+import numpy as np
+
+
+class MetadataIndex:
+    """Inverted indexes over employee fields, used to pre-filter vector search.
+
+    Filters are a dict of field -> condition:
+        "Finance"                     equality (or "has skill" for list fields)
+        {"Austin", "New York"}        any of the values (exact values on range fields too)
+        ("2020-01-01", "2022-12-31")  inclusive range; use None for an open end
+    """
+
+    CATEGORICAL_FIELDS = ("department", "location", "position", "manager", "performance_rating")
+    LIST_FIELDS = ("skills", "certifications")
+    RANGE_FIELDS = ("hire_date", "salary", "last_promotion")
+
+    def __init__(self):
+        self._postings = {field: {} for field in self.CATEGORICAL_FIELDS + self.LIST_FIELDS}
+        self._values = {}
+        self._sorted = {}
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, employee: Dict):
+        emp_id = employee['employee_id']
+        if emp_id in self._values:
+            self.remove([emp_id])
+        values = {}
+        for field in self.CATEGORICAL_FIELDS:
+            if employee.get(field) is not None:
+                values[field] = employee[field]
+                # A record with several values (e.g. two locations) matches each of them
+                for item in (values[field] if isinstance(values[field], list) else [values[field]]):
+                    self._postings[field].setdefault(item, set()).add(emp_id)
+        for field in self.LIST_FIELDS:
+            values[field] = list(employee.get(field) or [])
+            for item in values[field]:
+                self._postings[field].setdefault(item, set()).add(emp_id)
+        for field in self.RANGE_FIELDS:
+            if employee.get(field) is not None:
+                values[field] = employee[field]
+        self._values[emp_id] = values
+        self._sorted.clear()
+
+    def remove(self, emp_ids: Iterable[str]):
+        for emp_id in emp_ids:
+            values = self._values.pop(emp_id, None)
+            if values is None:
+                continue
+            for field in self.CATEGORICAL_FIELDS + self.LIST_FIELDS:
+                items = values.get(field)
+                if items is None:
+                    continue
+                for item in (items if isinstance(items, list) else [items]):
+                    posting = self._postings[field].get(item)
+                    if posting is not None:
+                        posting.discard(emp_id)
+                        if not posting:
+                            del self._postings[field][item]
+        self._sorted.clear()
+
+    def _range(self, field: str, low, high) -> Set[str]:
+        # Sorted (value, id) columns are rebuilt lazily after any change
+        if field not in self._sorted:
+            pairs = sorted((values[field], emp_id) for emp_id, values in self._values.items() if field in values)
+            self._sorted[field] = ([value for value, _ in pairs], [emp_id for _, emp_id in pairs])
+        keys, ids = self._sorted[field]
+        start = 0 if low is None else bisect.bisect_left(keys, low)
+        end = len(keys) if high is None else bisect.bisect_right(keys, high)
+        return set(ids[start:end])
+
+    def match(self, filters: Dict) -> Set[str]:
+        """Ids of employees satisfying every condition in `filters`."""
+        matched = None
+        for field, condition in filters.items():
+            if field in self.RANGE_FIELDS and isinstance(condition, tuple):
+                ids = self._range(field, *condition)
+            elif field in self._postings:
+                values = condition if isinstance(condition, (set, frozenset, list)) else [condition]
+                ids = set()
+                for value in values:
+                    ids |= self._postings[field].get(value, set())
+            elif field in self.RANGE_FIELDS:
+                values = condition if isinstance(condition, (set, frozenset, list)) else [condition]
+                ids = set()
+                for value in values:
+                    ids |= self._range(field, value, value)
+            else:
+                raise ValueError(f"Cannot filter on '{field}'")
+            matched = ids if matched is None else matched & ids
+            if not matched:
+                return set()
+        return set(self._values) if matched is None else matched
+
+    def save(self, directory: str, ids: List[str]):
+        """Write the postings and sorted range columns as flat arrays; records are stored as their row in `ids`."""
+        row_of = {emp_id: row for row, emp_id in enumerate(ids)}
+        columns = {"postings": {}, "ranges": {}}
+        offsets, rows = [0], []
+        for field, postings in self._postings.items():
+            columns["postings"][field] = list(postings)
+            for emp_ids in postings.values():
+                rows.extend(row_of[emp_id] for emp_id in emp_ids)
+                offsets.append(len(rows))
+        for field in self.RANGE_FIELDS:
+            self._range(field, None, None)
+            keys, emp_ids = self._sorted[field]
+            columns["ranges"][field] = keys
+            rows.extend(row_of[emp_id] for emp_id in emp_ids)
+            offsets.append(len(rows))
+        with open(os.path.join(directory, "metadata.json"), "w") as f:
+            json.dump(columns, f, ensure_ascii=False)
+        np.save(os.path.join(directory, "metadata_offsets.npy"), np.array(offsets, dtype=np.int64))
+        np.save(os.path.join(directory, "metadata_rows.npy"), np.array(rows, dtype=np.int32))
+
+    @classmethod
+    def load(cls, directory: str, ids: List[str]) -> "MetadataIndex":
+        """Read-only index over the arrays written by save(); postings are decoded when matched."""
+        index = cls()
+        with open(os.path.join(directory, "metadata.json")) as f:
+            columns = json.load(f)
+        offsets = np.load(os.path.join(directory, "metadata_offsets.npy"), mmap_mode="r")
+        rows = np.load(os.path.join(directory, "metadata_rows.npy"), mmap_mode="r")
+        position = 0
+        for field, values in columns["postings"].items():
+            index._postings[field] = _PostingsView(values, offsets[position:position + len(values) + 1], rows, ids)
+            position += len(values)
+        for field, keys in columns["ranges"].items():
+            index._sorted[field] = (keys, [ids[row] for row in rows[offsets[position]:offsets[position + 1]].tolist()])
+            position += 1
+        # Per-record values are only needed to update the index, which a loaded one never is
+        index._values = dict.fromkeys(ids)
+        return index
+
+
+class _PostingsView(Mapping):
+    """value -> set of ids, decoded on access from MetadataIndex.save() arrays."""
+
+    def __init__(self, values, offsets, rows, ids):
+        self._value_index = {value: v for v, value in enumerate(values)}
+        self._offsets = offsets
+        self._rows = rows
+        self._ids = ids
+
+    def __getitem__(self, value) -> Set[str]:
+        v = self._value_index[value]
+        return {self._ids[row] for row in self._rows[self._offsets[v]:self._offsets[v + 1]].tolist()}
+
+    def __iter__(self):
+        return iter(self._value_index)
+
+    def __len__(self):
+        return len(self._value_index)
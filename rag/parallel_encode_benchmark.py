@@ -0,0 +1,59 @@
+"""
+Ingest throughput of all-MiniLM-L6-v2 embedding vs. number of worker processes.
+
+Replicates the records in employee_records.json to --size texts and encodes them
+with 1, 2, 4, ... processes (model load time is excluded):
+    python parallel_encode_benchmark.py --size 20000 --workers 1 2 4 8
+"""
+
+import argparse
+import json
+import os
+import time
+
+from sentence_transformers import SentenceTransformer
+
+from embeddings import ParallelEncoder, encode_in_batches
+from rag_employee_inmemory import MODEL_NAME, SimpleRAGDemo
+
+
+def synthetic_texts(path, size):
+    with open(path) as f:
+        employees = json.load(f)
+    texts = [SimpleRAGDemo.employee_to_text(employee) for employee in employees]
+    return [f"{texts[i % len(texts)]} (record {i})" for i in range(size)]
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="employee_records.json")
+    parser.add_argument("--size", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1))))
+    args = parser.parse_args()
+
+    texts = synthetic_texts(args.data, args.size)
+    print(f"{len(texts)} texts, {cpus} CPUs")
+
+    encoder = SentenceTransformer(MODEL_NAME)
+    encoder.encode(texts[:args.batch_size], batch_size=args.batch_size)
+    started = time.perf_counter()
+    encode_in_batches(encoder, texts, batch_size=args.batch_size, show_progress=False)
+    baseline = len(texts) / (time.perf_counter() - started)
+    print(f"{'workers':<12}{'records/sec':>14}{'speedup':>10}")
+    print(f"{'in-process':<12}{baseline:>14.1f}{1.0:>10.2f}")
+
+    for workers in args.workers:
+        with ParallelEncoder(MODEL_NAME, workers=workers) as parallel:
+            parallel.encode(texts[:workers], batch_size=args.batch_size)  # wait for every model to load
+            started = time.perf_counter()
+            encode_in_batches(parallel, texts, batch_size=args.batch_size, show_progress=False,
+                              chunk_size=args.batch_size * workers * 4)
+            rate = len(texts) / (time.perf_counter() - started)
+        print(f"{workers:<12}{rate:>14.1f}{rate / baseline:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from typing import List
+
+import numpy as np
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry and counts hits/misses."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+
+def encode_queries_cached(encoder, cache: LRUCache, queries: List[str], batch_size: int = 64) -> np.ndarray:
+    """Embed queries, sending only the distinct ones missing from `cache` to the encoder in one call."""
+    embeddings = {}
+    # dict, not list: ordered like a list, but membership checks stay O(1) for large batches
+    missing = {}
+    for query in queries:
+        if query in embeddings or query in missing:
+            continue
+        embedding = cache.get(query)
+        if embedding is None:
+            missing[query] = None
+        else:
+            embeddings[query] = embedding
+    if missing:
+        missing = list(missing)
+        for query, embedding in zip(missing, encoder.encode(missing, batch_size=batch_size)):
+            cache.put(query, embedding)
+            embeddings[query] = embedding
+    return np.vstack([embeddings[query] for query in queries])
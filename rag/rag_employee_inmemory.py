@@ -1,21 +1,99 @@
 import json
+import os
+import time
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from typing import List, Dict
+from encoder_registry import get_encoder
+from embeddings import EmbeddingCache, ParallelEncoder, encode_with_cache
+from bm25_index import BM25Index, reciprocal_rank_fusion
+from metadata_index import MetadataIndex
+from query_cache import LRUCache, encode_queries_cached
+from reranker import CrossEncoderReranker
+from index_sync import diff_employees, employee_fingerprint
+from chunking import chunk_id, employee_chunks, max_per_parent, parent_id
+from record_stream import iter_record_chunks
+from document_table import DocumentTable, write_document_table
+from document_store import CompactDocumentStore
+from vector_store import make_vector_store
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
 
 class SimpleRAGDemo:
-    def __init__(self):
-        self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
-        self.vector_store = {}
-        self.documents = {}
+    def __init__(self, cache_path: str | None = "embedding_cache.sqlite", vector_index: str = "exact",
+                 index_options: Dict | None = None, query_cache_size: int = 1024, encode_workers: int = 1,
+                 torch_threads: int | None = None, encoder=None, reranker: CrossEncoderReranker | None = None,
+                 rerank_shortlist: int = 20, retrieve_budget_ms: float | None = None,
+                 rerank_budget_ms: float | None = 250, chunking: bool = False):
+        # Any object with SentenceTransformer's encode() can be passed in (e.g. a stub for benchmarks);
+        # otherwise the shared model is loaded on first use (see the encoder property)
+        self._encoder = encoder
+        # Embeddings of unchanged records are reused across runs; pass cache_path=None to disable
+        self.embedding_cache = EmbeddingCache(cache_path, MODEL_NAME) if cache_path else None
+        # With encode_workers > 1, ingestion shards records across a process pool (created on first use)
+        self.encode_workers = encode_workers
+        self.torch_threads = torch_threads
+        self._parallel_encoder = None
+        # "exact" scans every vector; "ivf" trades a little recall for sub-linear search;
+        # "int8"/"binary" keep quantized codes in ~1/4 of the RAM (see ann_report.py)
+        self.vector_index = vector_index
+        self.index_options = index_options or {}
+        self.vector_store = make_vector_store(vector_index, **self.index_options)
+        self.documents = CompactDocumentStore()
+        self.fingerprints = {}
+        self.metadata_index = MetadataIndex()
+        self.bm25_index = BM25Index()
+        # A memory-mapped load() uses the saved metadata/BM25 indexes; after load(mmap=False) they and
+        # the fingerprints are rebuilt on first use
+        self._side_indexes_stale = False
+        # Hot questions skip the transformer (query -> embedding) and the scan
+        # ((query, top_k) -> matches, dropped whenever the store changes)
+        self.query_cache = LRUCache(query_cache_size)
+        self.result_cache = LRUCache(query_cache_size)
+        self._result_cache_version = self.vector_store.version
+        # respond_with_rag re-ranks the top rerank_shortlist matches with a cross-encoder (0 disables it).
+        # If retrieval alone overran retrieve_budget_ms the shortlist is used as is; re-ranking stops
+        # scoring new batches after rerank_budget_ms
+        self.reranker = reranker or CrossEncoderReranker()
+        self.rerank_shortlist = rerank_shortlist
+        self.retrieve_budget_ms = retrieve_budget_ms
+        self.rerank_budget_ms = rerank_budget_ms
+        # With chunking=True each employee gets several vectors (profile, one per project, windows over
+        # the notes) with ids "<employee_id>#<n>"; searches score chunks and keep each employee's best one
+        self.chunking = chunking
+        self.chunk_ids: Dict[str, List[str]] = {}
+
+    @property
+    def encoder(self):
+        if self._encoder is None:
+            self._encoder = get_encoder(MODEL_NAME)
+        return self._encoder
+
+    def close(self):
+        """Shut down the encoder process pool (if one was started) and the embedding cache."""
+        if getattr(self, '_parallel_encoder', None) is not None:
+            self._parallel_encoder.close()
+            self._parallel_encoder = None
+        if getattr(self, 'embedding_cache', None) is not None:
+            self.embedding_cache.close()
+            self.embedding_cache = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        self.close()
 
     def load_employee_data(self, json_file_path: str):
         with open(json_file_path, 'r') as file:
             return json.load(file)
 
-    def create_employee_embeddings(self, employees: List[Dict]):
-        for employee in employees:
-            text = f"""
+    @staticmethod
+    def employee_to_text(employee: Dict) -> str:
+        text = f"""
             Name: {employee['name']}
             Department: {employee['department']}
             Position: {employee['position']}
@@ -26,38 +104,316 @@ class SimpleRAGDemo:
             Performance: {employee['performance_rating']}
             Certifications: {', '.join(employee['certifications'])}
             """
-            embedding = self.encoder.encode(text.strip())
-            emp_id = employee['employee_id']
-            self.vector_store[emp_id] = embedding
+        return text.strip()
+
+    def create_employee_embeddings(self, employees: List[Dict], batch_size: int = 64, show_progress: bool = True):
+        # A record repeated in one call counts once, as its last copy (so chunks of an earlier copy aren't orphaned)
+        employees = list({employee['employee_id']: employee for employee in employees}.values())
+        # Render every record first so the encoder sees whole batches, not one text at a time
+        texts = [self.employee_to_text(employee) for employee in employees]
+        emp_ids = [employee['employee_id'] for employee in employees]
+        if self.chunking:
+            per_employee = [employee_chunks(employee) for employee in employees]
+            vector_ids = [chunk_id(emp_id, n) for emp_id, chunks in zip(emp_ids, per_employee) for n in range(len(chunks))]
+            vector_texts = [chunk for chunks in per_employee for chunk in chunks]
+        else:
+            vector_ids, vector_texts = emp_ids, texts
+        encoder, chunk_size = self._ingest_encoder(batch_size)
+        embeddings = encode_with_cache(encoder, vector_texts, self.embedding_cache, batch_size=batch_size,
+                                       show_progress=show_progress, chunk_size=chunk_size)
+        self._check_writable()
+        self._ensure_side_indexes()
+        if self.chunking:
+            # An updated employee may now have fewer chunks than before
+            self._remove_vectors(emp_ids)
+            for emp_id, chunks in zip(emp_ids, per_employee):
+                self.chunk_ids[emp_id] = [chunk_id(emp_id, n) for n in range(len(chunks))]
+        self.vector_store.add_batch(vector_ids, embeddings)
+        for emp_id, employee, text in zip(emp_ids, employees, texts):
             self.documents[emp_id] = employee
+            self.fingerprints[emp_id] = employee_fingerprint(employee)
+            self.metadata_index.add(employee)
+            self.bm25_index.add(emp_id, text)
+
+    def _ingest_encoder(self, batch_size: int):
+        if self.encode_workers <= 1:
+            return self.encoder, None
+        if self._parallel_encoder is None:
+            self._parallel_encoder = ParallelEncoder(MODEL_NAME, self.encode_workers, self.torch_threads)
+        # A few batches per worker per call keeps every process busy
+        return self._parallel_encoder, batch_size * self.encode_workers * 4
+
+    def ingest_file(self, json_file_path: str, chunk_size: int = 1000, batch_size: int = 64,
+                    show_progress: bool = True) -> int:
+        """Stream records from a JSON array or JSON Lines file into the index, chunk_size at a time,
+        so the raw file is never held in memory as a whole."""
+        total = 0
+        for chunk in iter_record_chunks(json_file_path, chunk_size):
+            self.create_employee_embeddings(chunk, batch_size=batch_size, show_progress=False)
+            total += len(chunk)
+            if show_progress:
+                print(f"Indexed {total} records")
+        return total
+
+    def sync_employees(self, employees: List[Dict], batch_size: int = 64, show_progress: bool = True):
+        """Bring the index in line with `employees`, touching only new, changed or removed records."""
+        self._check_writable()
+        self._ensure_side_indexes()
+        upserts, deletes = diff_employees(self.fingerprints, employees)
+        self._remove_vectors(deletes)
+        self.metadata_index.remove(deletes)
+        self.bm25_index.remove(deletes)
+        for emp_id in deletes:
+            del self.documents[emp_id]
+            del self.fingerprints[emp_id]
+        if upserts:
+            self.create_employee_embeddings(upserts, batch_size=batch_size, show_progress=show_progress)
+        if show_progress:
+            print(f"Sync: {len(upserts)} upserted, {len(deletes)} deleted, "
+                  f"{len(employees) - len(upserts)} unchanged")
+        return upserts, deletes
+
+    def save(self, path: str):
+        """Write the index to a directory: flat .npy vector arrays plus a JSON Lines document table,
+        with the BM25 and metadata indexes as flat arrays next to it."""
+        self._ensure_side_indexes()
+        self.vector_store.save(path)
+        document_ids = self._document_ids()
+        write_document_table(path, document_ids, self.documents)
+        self.bm25_index.save(path, document_ids)
+        self.metadata_index.save(path, document_ids)
+        with open(os.path.join(path, "index.json"), "w") as f:
+            json.dump({"model": MODEL_NAME, "vector_index": self.vector_index,
+                       "index_options": self.index_options, "chunking": self.chunking}, f)
+
+    def load(self, path: str, mmap: bool = True):
+        """Load an index written by save().
+
+        With mmap=True (the default) vectors and documents are memory-mapped read-only,
+        so worker processes on one host share a single copy through the page cache.
+        Use mmap=False to load into memory when the index will be modified (e.g. synced).
+        """
+        with open(os.path.join(path, "index.json")) as f:
+            meta = json.load(f)
+        if meta["model"] != MODEL_NAME:
+            raise ValueError(f"Index was built with {meta['model']}, not {MODEL_NAME}")
+        self.vector_index = meta["vector_index"]
+        self.index_options = meta["index_options"]
+        self.vector_store = make_vector_store(self.vector_index, **self.index_options)
+        self.vector_store.load(path, mmap=mmap)
+        self.chunking = meta.get("chunking", False)
+        self.chunk_ids = {}
+        if self.chunking:
+            for vector_id in self.vector_store.ids:
+                self.chunk_ids.setdefault(parent_id(vector_id), []).append(vector_id)
+        table = DocumentTable(path, self._document_ids())
+        if mmap:
+            self.documents = table
+        else:
+            self.documents = CompactDocumentStore()
+            for emp_id, employee in table.items():
+                self.documents[emp_id] = employee
+        self.fingerprints = {}
+        if mmap and os.path.exists(os.path.join(path, "bm25_terms.json")):
+            # Read-only, so the saved indexes are used as is and no fingerprints are needed
+            self.metadata_index = MetadataIndex.load(path, self._document_ids())
+            self.bm25_index = BM25Index.load(path, self._document_ids())
+            self._side_indexes_stale = False
+        else:
+            self.metadata_index = MetadataIndex()
+            self.bm25_index = BM25Index()
+            self._side_indexes_stale = True
+        # The new store's version counter starts over, so it can't tell us the cached results are stale
+        self.result_cache.clear()
+        self._result_cache_version = self.vector_store.version
+
+    def _document_ids(self) -> List[str]:
+        # Employee ids in vector-store order; save() and load() must agree on it
+        if not self.chunking:
+            return self.vector_store.ids
+        return list(dict.fromkeys(parent_id(vector_id) for vector_id in self.vector_store.ids))
+
+    def _vector_ids(self, emp_ids) -> List[str]:
+        if not self.chunking:
+            return list(emp_ids)
+        return [vector_id for emp_id in emp_ids for vector_id in self.chunk_ids.get(emp_id, ())]
+
+    def _remove_vectors(self, emp_ids: List[str]):
+        self.vector_store.remove(self._vector_ids(emp_ids))
+        for emp_id in emp_ids:
+            self.chunk_ids.pop(emp_id, None)
+
+    def _chunk_depth(self, top_k: int) -> int:
+        # How many chunk matches to fetch to (usually) cover top_k distinct employees
+        chunks_per_employee = len(self.vector_store) / max(len(self.chunk_ids), 1)
+        return max(top_k, int(top_k * chunks_per_employee * 2))
 
-    def search_employees(self, query: str, top_k: int = 2) -> List[Dict]:
-        query_embedding = self.encoder.encode(query)
-        similarities = {}
-        for emp_id, emp_embedding in self.vector_store.items():
-            similarity = np.dot(query_embedding, emp_embedding) / (
-                np.linalg.norm(query_embedding) * np.linalg.norm(emp_embedding)
-            )
-            similarities[emp_id] = similarity
-        top_matches = sorted(similarities.items(), key=lambda x: x[1], reverse=True)[:top_k]
+    def _vector_search(self, query_embedding: np.ndarray, top_k: int, candidate_ids=None):
+        """vector_store.search over employees; with chunking, the max chunk score per employee."""
+        if not self.chunking:
+            return self.vector_store.search(query_embedding, top_k, candidate_ids)
+        if candidate_ids is not None:
+            candidate_ids = self._vector_ids(candidate_ids)
+        depth = self._chunk_depth(top_k)
+        while True:
+            matches = self.vector_store.search(query_embedding, depth, candidate_ids)
+            top_matches = max_per_parent(matches, top_k)
+            if len(top_matches) == top_k or len(matches) < depth:
+                return top_matches
+            depth *= 4
+
+    def _vector_search_batch(self, query_embeddings: np.ndarray, top_k: int):
+        if not self.chunking:
+            return self.vector_store.search_batch(query_embeddings, top_k)
+        depth = self._chunk_depth(top_k)
+        all_matches = []
+        for query_embedding, matches in zip(query_embeddings, self.vector_store.search_batch(query_embeddings, depth)):
+            top_matches = max_per_parent(matches, top_k)
+            if len(top_matches) < top_k and len(matches) == depth:
+                # Too many chunks of the same employees at the top; search this query deeper
+                top_matches = self._vector_search(query_embedding, top_k)
+            all_matches.append(top_matches)
+        return all_matches
+
+    def _check_writable(self):
+        if isinstance(self.documents, DocumentTable):
+            raise RuntimeError("This index was loaded memory-mapped (read-only); use load(path, mmap=False) to modify it")
+
+    def _ensure_side_indexes(self):
+        if not self._side_indexes_stale:
+            return
+        # Fingerprints are only used to sync, which a read-only (memory-mapped) index can't do
+        writable = not isinstance(self.documents, DocumentTable)
+        for emp_id, employee in self.documents.items():
+            if writable:
+                self.fingerprints[emp_id] = employee_fingerprint(employee)
+            self.metadata_index.add(employee)
+            self.bm25_index.add(emp_id, self.employee_to_text(employee))
+        self._side_indexes_stale = False
+
+    def _materialize(self, top_matches) -> List[Dict]:
         results = []
         for emp_id, score in top_matches:
-            employee = self.documents[emp_id].copy()
+            # Both document stores build a fresh dict per lookup, so no copy is needed
+            employee = self.documents[emp_id]
             employee['similarity_score'] = score
             results.append(employee)
         return results
 
+    def encode_queries(self, queries: List[str], batch_size: int = 64) -> np.ndarray:
+        """Embed queries, sending only the ones not in the query cache to the encoder."""
+        return encode_queries_cached(self.encoder, self.query_cache, queries, batch_size=batch_size)
+
+    def _cached_results(self):
+        if self._result_cache_version != self.vector_store.version:
+            self.result_cache.clear()
+            self._result_cache_version = self.vector_store.version
+        return self.result_cache
+
+    def search_employees(self, query: str, top_k: int = 2, filters: Dict | None = None,
+                         mode: str = "vector", candidates: int = 50) -> List[Dict]:
+        """Semantic search, optionally restricted by metadata, e.g.
+        filters={"department": "Finance", "location": {"Austin", "Chicago"}, "hire_date": ("2020-01-01", None)}
+
+        mode="hybrid" also ranks the top `candidates` by BM25 over the same record text and fuses
+        both rankings (reciprocal rank fusion); similarity_score is then the fused score.
+        """
+        if mode not in ("vector", "hybrid"):
+            raise ValueError(f"Unknown search mode '{mode}', expected 'vector' or 'hybrid'")
+        result_cache = self._cached_results()
+        # candidates only changes hybrid rankings, so vector-mode entries are shared across it
+        cache_key = (query, top_k, mode, candidates if mode == "hybrid" else None)
+        if not filters:
+            top_matches = result_cache.get(cache_key)
+            if top_matches is not None:
+                return self._materialize(top_matches)
+
+        if filters or mode == "hybrid":
+            self._ensure_side_indexes()
+        candidate_ids = None
+        if filters:
+            # Only the vectors of matching employees are scored
+            candidate_ids = self.metadata_index.match(filters)
+            if not candidate_ids:
+                return []
+        query_embedding = self.encode_queries([query])[0]
+        if mode == "vector":
+            top_matches = self._vector_search(query_embedding, top_k, candidate_ids)
+        else:
+            dense = self._vector_search(query_embedding, max(candidates, top_k), candidate_ids)
+            top_matches = self._fuse(query, dense, top_k, candidates, candidate_ids)
+
+        if not filters:
+            result_cache.put(cache_key, top_matches)
+        return self._materialize(top_matches)
+
+    def _fuse(self, query: str, dense, top_k: int, candidates: int, candidate_ids=None):
+        lexical = self.bm25_index.search(query, max(candidates, top_k), candidate_ids)
+        return reciprocal_rank_fusion([dense, lexical])[:top_k]
+
+    def search_employees_batch(self, queries: List[str], top_k: int = 2, batch_size: int = 64,
+                               mode: str = "vector", candidates: int = 50) -> List[List[Dict]]:
+        """Encode all queries in one encoder call and score them together; one result list per query."""
+        query_embeddings = self.encode_queries(queries, batch_size=batch_size)
+        if mode == "vector":
+            all_matches = self._vector_search_batch(query_embeddings, top_k)
+        elif mode == "hybrid":
+            self._ensure_side_indexes()
+            dense = self._vector_search_batch(query_embeddings, max(candidates, top_k))
+            all_matches = [self._fuse(query, matches, top_k, candidates) for query, matches in zip(queries, dense)]
+        else:
+            raise ValueError(f"Unknown search mode '{mode}', expected 'vector' or 'hybrid'")
+        return [self._materialize(matches) for matches in all_matches]
+
+    def search_reranked(self, query: str, top_k: int = 2, mode: str = "hybrid", filters: Dict | None = None,
+                        timings: Dict | None = None) -> List[Dict]:
+        """Two-stage search: the top rerank_shortlist matches of search_employees, re-ordered by the
+        cross-encoder. Re-ranked results carry a rerank_score next to their similarity_score.
+
+        If given, `timings` receives retrieve_s, rerank_s and reranked (how many were scored).
+        """
+        timings = timings if timings is not None else {}
+        started = time.perf_counter()
+        matches = self.search_employees(query, top_k=max(self.rerank_shortlist, top_k), filters=filters, mode=mode)
+        timings["retrieve_s"] = time.perf_counter() - started
+        return self._rerank(query, matches, top_k, timings)
+
+    def _rerank(self, query: str, matches: List[Dict], top_k: int, timings: Dict) -> List[Dict]:
+        over_budget = self.retrieve_budget_ms is not None and timings["retrieve_s"] * 1000 > self.retrieve_budget_ms
+        if self.rerank_shortlist <= 0 or len(matches) <= 1 or over_budget:
+            timings["rerank_s"], timings["reranked"] = 0.0, 0
+            return matches[:top_k]
+        budget_s = self.rerank_budget_ms / 1000 if self.rerank_budget_ms is not None else None
+        return self.reranker.rerank_records(query, matches, [self.employee_to_text(e) for e in matches],
+                                            top_k, budget_s, timings)
+
+    def cache_stats(self) -> Dict:
+        return {"query_embeddings": self.query_cache.stats(), "results": self.result_cache.stats(),
+                "rerank_scores": self.reranker.cache.stats()}
+
     def respond_with_rag(self, question: str) -> str | dict:
-        relevant_employees = self.search_employees(question, top_k=1)
+        # Hybrid retrieval catches exact skill/certification names the embedding can miss;
+        # the cross-encoder then picks the best of that shortlist
+        relevant_employees = self.search_reranked(question, top_k=1, mode="hybrid")
         if not relevant_employees:
             return "No relevant employee information found."
         employee = relevant_employees[0]
         return employee
 
+    def respond_with_rag_batch(self, questions: List[str]) -> List[str | dict]:
+        answers = []
+        # One batched first stage for all questions, then a re-rank per question
+        started = time.perf_counter()
+        shortlists = self.search_employees_batch(questions, top_k=max(self.rerank_shortlist, 1), mode="hybrid")
+        retrieve_s = (time.perf_counter() - started) / max(len(questions), 1)
+        for question, matches in zip(questions, shortlists):
+            relevant_employees = self._rerank(question, matches, 1, {"retrieve_s": retrieve_s})
+            answers.append(relevant_employees[0] if relevant_employees else "No relevant employee information found.")
+        return answers
+
 def main():
     rag = SimpleRAGDemo()
-    employees = rag.load_employee_data("employee_records.json")
-    rag.create_employee_embeddings(employees)
+    rag.ingest_file("employee_records.json")
 
     questions = [
         "Who has Python and machine learning skills?",
@@ -66,9 +422,10 @@ def main():
         "Do we have any finance analysts?"
     ]
 
-    for q in questions:
+    # All questions are encoded and scored together
+    for q, answer in zip(questions, rag.respond_with_rag_batch(questions)):
         print("\nQ:", q)
-        print(rag.respond_with_rag(q))
+        print(answer)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,65 @@
+import json
+from itertools import islice
+from typing import Dict, Iterator, List
+
+
+def _iter_json_lines(f) -> Iterator[Dict]:
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _iter_json_array(f, read_size: int = 1 << 16) -> Iterator[Dict]:
+    """Yield the elements of a top-level JSON array of objects without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buffer = f.read(read_size).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("Expected a top-level JSON array")
+    pos = 1
+    eof = False
+    while True:
+        # Skip whitespace and the separating comma before the next element
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            if pos >= len(buffer):
+                raise json.JSONDecodeError("need more data", buffer, pos)
+            record, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # The element spans the end of the buffer: drop consumed text and read more
+            chunk = f.read(read_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        yield record
+
+
+def iter_employee_records(path: str) -> Iterator[Dict]:
+    """Stream records from a JSON array file or a JSON Lines (.jsonl / .ndjson) file."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            yield from _iter_json_lines(f)
+            return
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == "[":
+            yield from _iter_json_array(f)
+        else:
+            yield from _iter_json_lines(f)
+
+
+def iter_record_chunks(path: str, chunk_size: int = 1000) -> Iterator[List[Dict]]:
+    records = iter_employee_records(path)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,78 @@
+import time
+from typing import Dict, List, Optional
+
+from encoder_registry import get_cross_encoder
+from query_cache import LRUCache
+
+RERANK_MODEL = 'cross-encoder/ms-marco-MiniLM-L-6-v2'
+
+
+class CrossEncoderReranker:
+    """Second retrieval stage: scores (query, record text) pairs with a cross-encoder on CPU.
+
+    The cross-encoder reads query and record together, so it orders a shortlist far better
+    than cosine similarity, but costs one model pass per pair; only run it on a small top-N.
+    Pair scores are kept in an LRU cache, so repeated questions re-rank without the model.
+    """
+
+    def __init__(self, model_name: str = RERANK_MODEL, batch_size: int = 32, cache_size: int = 4096, model=None):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache = LRUCache(cache_size)
+        # Any object with CrossEncoder's predict() can be passed in; otherwise loaded on first use
+        self._model = model
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = get_cross_encoder(self.model_name)
+        return self._model
+
+    def score(self, query: str, texts: List[str], budget_s: Optional[float] = None) -> List[Optional[float]]:
+        """Relevance score per text, None for texts not scored before budget_s ran out.
+
+        Uncached pairs are scored in batches, in the given order, and the budget is checked
+        between batches, so the first batch always runs.
+        """
+        keys = [(query, text) for text in texts]
+        scores = [self.cache.get(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+        started = time.perf_counter()
+        for start in range(0, len(missing), self.batch_size):
+            if start and budget_s is not None and time.perf_counter() - started > budget_s:
+                break
+            batch = missing[start:start + self.batch_size]
+            predicted = self.model.predict([keys[i] for i in batch], batch_size=self.batch_size)
+            for i, score in zip(batch, predicted):
+                scores[i] = float(score)
+                self.cache.put(keys[i], scores[i])
+        return scores
+
+    def rerank(self, query: str, items: List, texts: List[str], top_k: int,
+               budget_s: Optional[float] = None) -> List[tuple]:
+        """Top `top_k` (item, score) pairs by cross-encoder score.
+
+        `items` are in first-stage order. Items the budget did not reach keep that order
+        after the scored ones, with score None.
+        """
+        scores = self.score(query, texts, budget_s)
+        scored = sorted((pair for pair in zip(items, scores) if pair[1] is not None), key=lambda pair: -pair[1])
+        unscored = [(item, None) for item, score in zip(items, scores) if score is None]
+        return (scored + unscored)[:top_k]
+
+    def rerank_records(self, query: str, records: List[Dict], texts: List[str], top_k: int,
+                       budget_s: Optional[float] = None, timings: Optional[Dict] = None) -> List[Dict]:
+        """rerank() for record dicts: re-ranked records get a rerank_score field, and
+        `timings` (if given) receives rerank_s and reranked (how many were scored)."""
+        started = time.perf_counter()
+        results = []
+        reranked = 0
+        for record, score in self.rerank(query, records, texts, top_k, budget_s):
+            if score is not None:
+                record['rerank_score'] = score
+                reranked += 1
+            results.append(record)
+        if timings is not None:
+            timings["rerank_s"] = time.perf_counter() - started
+            timings["reranked"] = reranked
+        return results
@@ -0,0 +1,67 @@
+"""
+Where the cold start of a short-lived RAG invocation goes.
+
+Times, in a fresh process: importing the RAG module, importing sentence_transformers/torch,
+loading all-MiniLM-L6-v2, building the in-memory index (or loading a saved one with --index),
+the first query, and a second SimpleRAGDemo that reuses the already-loaded shared model:
+    python startup_profile.py
+    python startup_profile.py --index employee_index
+"""
+
+import argparse
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="employee_records.json")
+    parser.add_argument("--index", help="load this saved index (memory-mapped) instead of building one")
+    parser.add_argument("--cache-path", default="embedding_cache.sqlite",
+                        help="embedding cache for the build ('' disables it)")
+    args = parser.parse_args()
+
+    stages = []
+
+    def stage(name, started):
+        stages.append((name, time.perf_counter() - started))
+
+    started = time.perf_counter()
+    from rag_employee_inmemory import MODEL_NAME, SimpleRAGDemo
+    from encoder_registry import get_encoder
+    stage("import rag_employee_inmemory", started)
+
+    started = time.perf_counter()
+    import sentence_transformers  # noqa: F401
+    stage("import sentence_transformers", started)
+
+    started = time.perf_counter()
+    get_encoder(MODEL_NAME)
+    stage("load model", started)
+
+    started = time.perf_counter()
+    rag = SimpleRAGDemo(cache_path=args.cache_path or None)
+    if args.index:
+        rag.load(args.index)
+        stage("load index (mmap)", started)
+    else:
+        rag.ingest_file(args.data, show_progress=False)
+        stage("build index", started)
+
+    started = time.perf_counter()
+    rag.search_employees("Who has Python and machine learning skills?")
+    stage("first query", started)
+
+    started = time.perf_counter()
+    second = SimpleRAGDemo(cache_path=None)
+    second.encode_queries(["Find someone with sales experience"])
+    stage("2nd instance + query (shared model)", started)
+
+    total = sum(seconds for _, seconds in stages)
+    print(f"{'stage':<38}{'ms':>10}{'share':>8}")
+    for name, seconds in stages:
+        print(f"{name:<38}{seconds * 1000:>10.1f}{seconds / total:>8.1%}")
+    print(f"{'total':<38}{total * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+import json
+import os
+
+import numpy as np
+from typing import Iterable, List, Tuple
+
+
+class MatrixVectorStore:
+    """Exact cosine-similarity store backed by one contiguous float32 matrix.
+
+    Embeddings are L2-normalized once on insert, so a query is a single
+    matrix-vector product followed by an argpartition top-k.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        self.initial_capacity = initial_capacity
+        self.ids: List[str] = []
+        self._id_to_row = {}
+        self._matrix = None
+        # Bumped on every insert/remove so callers can invalidate cached results
+        self.version = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, emp_id):
+        return emp_id in self._id_to_row
+
+    @property
+    def dim(self):
+        return None if self._matrix is None else self._matrix.shape[1]
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """View of the filled rows (no copy)."""
+        if self._matrix is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._matrix[:len(self.ids)]
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, top_k: int) -> np.ndarray:
+        """Indices of the top_k highest scores, best first, without a full sort."""
+        k = min(top_k, scores.shape[0])
+        if k < scores.shape[0]:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(scores.shape[0])
+        return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+    # Per-row arrays kept in step on grow/remove; subclasses with other encodings extend this
+    _row_arrays = ("_matrix",)
+
+    def _allocate(self, capacity: int, dim: int):
+        self._matrix = np.empty((capacity, dim), dtype=np.float32)
+
+    def _encode(self, vectors: np.ndarray) -> dict:
+        """Map normalized float32 rows to the values stored in each of _row_arrays."""
+        return {"_matrix": vectors}
+
+    def _write_rows(self, rows, vectors: np.ndarray):
+        for name, values in self._encode(vectors).items():
+            getattr(self, name)[rows] = values
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the filled rows of the vector arrays."""
+        if self._matrix is None:
+            return 0
+        return sum(getattr(self, name)[:len(self.ids)].nbytes for name in self._row_arrays)
+
+    def _reserve(self, rows: int, dim: int):
+        if self._matrix is None:
+            self._allocate(max(self.initial_capacity, rows), dim)
+            return
+        if dim != self._matrix.shape[1]:
+            raise ValueError(f"Expected embeddings of dimension {self._matrix.shape[1]}, got {dim}")
+        needed = len(self.ids) + rows
+        if needed > self._matrix.shape[0]:
+            # Grow geometrically so bulk loads stay amortized O(n)
+            capacity = max(needed, 2 * self._matrix.shape[0])
+            for name in self._row_arrays:
+                current = getattr(self, name)
+                grown = np.empty((capacity,) + current.shape[1:], dtype=current.dtype)
+                grown[:len(self.ids)] = current[:len(self.ids)]
+                setattr(self, name, grown)
+
+    def add(self, emp_id: str, embedding: np.ndarray):
+        self.add_batch([emp_id], np.asarray(embedding).reshape(1, -1))
+
+    def add_batch(self, ids: List[str], embeddings: np.ndarray):
+        embeddings = self._normalize(np.atleast_2d(embeddings))
+        if len(ids) != embeddings.shape[0]:
+            raise ValueError("ids and embeddings must have the same length")
+        self.version += 1
+        # An id repeated within the batch keeps only its last vector
+        latest = {emp_id: index for index, emp_id in enumerate(ids)}
+        new_ids = []
+        new_rows = []
+        for emp_id, index in latest.items():
+            row = embeddings[index]
+            if emp_id in self._id_to_row:
+                # Re-adding an existing id overwrites its vector in place; a 1-row slice keeps
+                # every encoded array (including 1-D ones like _scales) shape-compatible
+                existing = self._id_to_row[emp_id]
+                self._write_rows(slice(existing, existing + 1), row[None, :])
+            else:
+                new_ids.append(emp_id)
+                new_rows.append(row)
+        if not new_ids:
+            return
+        self._reserve(len(new_ids), embeddings.shape[1])
+        start = len(self.ids)
+        self._write_rows(slice(start, start + len(new_ids)), np.stack(new_rows))
+        for offset, emp_id in enumerate(new_ids):
+            self._id_to_row[emp_id] = start + offset
+        self.ids.extend(new_ids)
+
+    def remove(self, ids: List[str]):
+        self.version += 1
+        for emp_id in ids:
+            row = self._id_to_row.pop(emp_id, None)
+            if row is None:
+                continue
+            # Move the last row into the hole so the matrix stays contiguous
+            last = len(self.ids) - 1
+            if row != last:
+                moved_id = self.ids[last]
+                for name in self._row_arrays:
+                    array = getattr(self, name)
+                    array[row] = array[last]
+                self.ids[row] = moved_id
+                self._id_to_row[moved_id] = row
+            self.ids.pop()
+
+    def save(self, directory: str):
+        """Write each per-row array as a flat .npy file plus the id list."""
+        os.makedirs(directory, exist_ok=True)
+        for name in self._row_arrays:
+            array = getattr(self, name)
+            filled = array[:len(self.ids)] if array is not None else np.empty((0, 0), dtype=np.float32)
+            np.save(os.path.join(directory, f"{name.lstrip('_')}.npy"), filled)
+        with open(os.path.join(directory, "ids.json"), "w") as f:
+            json.dump(self.ids, f)
+
+    def load(self, directory: str, mmap: bool = True):
+        """Replace the contents with a saved index.
+
+        With mmap=True the arrays are read-only memory maps of the files, so startup
+        does no copying and processes on one host share the pages; load with
+        mmap=False to modify the store afterwards.
+        """
+        with open(os.path.join(directory, "ids.json")) as f:
+            self.ids = json.load(f)
+        self._id_to_row = {emp_id: row for row, emp_id in enumerate(self.ids)}
+        for name in self._row_arrays:
+            setattr(self, name, np.load(os.path.join(directory, f"{name.lstrip('_')}.npy"),
+                                        mmap_mode="r" if mmap else None))
+        if not self.ids:
+            self._matrix = None
+        self.version += 1
+
+    def search(self, query_embedding: np.ndarray, top_k: int = 2,
+               candidate_ids: Iterable[str] | None = None) -> List[Tuple[str, float]]:
+        """Top-k ids by cosine similarity; `candidate_ids` restricts the scan to those rows."""
+        if not self.ids or top_k <= 0:
+            return []
+        query = self._normalize(query_embedding).ravel()
+        if candidate_ids is None:
+            scores = self.matrix @ query
+            order = self._top_k(scores, top_k)
+            return [(self.ids[i], float(scores[i])) for i in order]
+        rows = self.rows_for(candidate_ids)
+        scores = self.matrix[rows] @ query
+        order = self._top_k(scores, top_k)
+        return [(self.ids[rows[i]], float(scores[i])) for i in order]
+
+    def rows_for(self, ids: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self._id_to_row[i] for i in ids if i in self._id_to_row), dtype=np.int64)
+
+    def search_batch(self, query_embeddings: np.ndarray, top_k: int = 2,
+                     max_scores_per_chunk: int = 1 << 26) -> List[List[Tuple[str, float]]]:
+        """Score many queries with one matrix-matrix product per chunk of queries."""
+        queries = self._normalize(np.atleast_2d(query_embeddings))
+        if not self.ids or top_k <= 0:
+            return [[] for _ in range(len(queries))]
+        n = len(self.ids)
+        k = min(top_k, n)
+        # Bound the (queries x rows) score block to ~max_scores_per_chunk floats
+        chunk_size = max(1, max_scores_per_chunk // n)
+        results = []
+        for start in range(0, len(queries), chunk_size):
+            scores = queries[start:start + chunk_size] @ self.matrix.T
+            if k < n:
+                candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            else:
+                candidates = np.broadcast_to(np.arange(n), scores.shape)
+            candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+            order = np.argsort(-candidate_scores, axis=1, kind="stable")
+            top_rows = np.take_along_axis(candidates, order, axis=1)
+            top_scores = np.take_along_axis(candidate_scores, order, axis=1)
+            for rows, row_scores in zip(top_rows, top_scores):
+                results.append([(self.ids[i], float(score)) for i, score in zip(rows, row_scores)])
+        return results
+
+
+class IVFVectorStore(MatrixVectorStore):
+    """Approximate store: rows are bucketed by spherical k-means, and a query
+    only scans the `n_probe` buckets whose centroids are closest to it.
+
+    Buckets are (re)built lazily on the first search after any insert/remove. The centroids
+    are retrained once the store has grown `retrain_growth` times past the size they were
+    trained at, so the number of lists keeps up with sqrt(n).
+    """
+
+    def __init__(self, n_lists: int | None = None, n_probe: int = 8, train_iterations: int = 10,
+                 train_sample_size: int = 50000, seed: int = 0, initial_capacity: int = 1024,
+                 retrain_growth: float = 4.0):
+        super().__init__(initial_capacity=initial_capacity)
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_iterations = train_iterations
+        self.train_sample_size = train_sample_size
+        self.seed = seed
+        self.retrain_growth = retrain_growth
+        self.centroids = None
+        self._trained_size = 0
+        self._lists = []
+        self._dirty = True
+
+    def add_batch(self, ids: List[str], embeddings: np.ndarray):
+        super().add_batch(ids, embeddings)
+        self._dirty = True
+
+    def remove(self, ids: List[str]):
+        super().remove(ids)
+        self._dirty = True
+
+    def save(self, directory: str):
+        super().save(directory)
+        if self.centroids is not None:
+            np.save(os.path.join(directory, "centroids.npy"), self.centroids)
+
+    def load(self, directory: str, mmap: bool = True):
+        super().load(directory, mmap)
+        path = os.path.join(directory, "centroids.npy")
+        self.centroids = np.load(path) if os.path.exists(path) else None
+        self._trained_size = len(self)
+        self._dirty = True
+
+    def train(self):
+        """Fit the coarse centroids on (a sample of) the stored vectors."""
+        vectors = self.matrix
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(vectors))))
+        n_lists = min(n_lists, len(vectors))
+        rng = np.random.default_rng(self.seed)
+        if len(vectors) > self.train_sample_size:
+            vectors = vectors[rng.choice(len(vectors), self.train_sample_size, replace=False)]
+        centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+        for _ in range(self.train_iterations):
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = vectors[assignment == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = self._normalize(centroids)
+        self.centroids = centroids
+        self._trained_size = len(self.ids)
+        self._dirty = True
+
+    def _assign(self, vectors: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        return np.concatenate([
+            np.argmax(vectors[start:start + chunk_size] @ self.centroids.T, axis=1)
+            for start in range(0, len(vectors), chunk_size)
+        ])
+
+    def _rebuild_lists(self):
+        if self.centroids is None or len(self) > self.retrain_growth * self._trained_size:
+            self.train()
+        assignment = self._assign(self.matrix)
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(len(self.centroids) + 1))
+        self._lists = [order[bounds[c]:bounds[c + 1]] for c in range(len(self.centroids))]
+        self._dirty = False
+
+    def search(self, query_embedding: np.ndarray, top_k: int = 2,
+               candidate_ids: Iterable[str] | None = None) -> List[Tuple[str, float]]:
+        if candidate_ids is not None:
+            # A pre-filtered subset is scanned exactly
+            return super().search(query_embedding, top_k, candidate_ids)
+        if not self.ids or top_k <= 0:
+            return []
+        if self._dirty:
+            self._rebuild_lists()
+        query = self._normalize(query_embedding).ravel()
+        n_probe = min(self.n_probe, len(self.centroids))
+        probes = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+        rows = np.concatenate([self._lists[c] for c in probes])
+        if rows.size == 0:
+            return []
+        scores = self.matrix[rows] @ query
+        order = self._top_k(scores, top_k)
+        return [(self.ids[rows[i]], float(scores[i])) for i in order]
+
+    def search_batch(self, query_embeddings: np.ndarray, top_k: int = 2, **_) -> List[List[Tuple[str, float]]]:
+        # Each query probes different buckets, so there is no shared matrix product to batch
+        return [self.search(query, top_k) for query in np.atleast_2d(query_embeddings)]
+
+
+# Number of set bits in every possible byte, for Hamming distances on packed sign codes
+_POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+
+def _popcount(packed: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return np.bitwise_count(packed)
+    return _POPCOUNT[packed]
+
+
+class QuantizedVectorStore(MatrixVectorStore):
+    """Compressed store: each row is kept as int8 codes plus one float32 scale
+    (about 1/4 of the float32 matrix).
+
+    mode="int8" scans the int8 codes directly. mode="binary" also keeps 1-bit
+    sign codes; a query first takes the `rescore_factor * top_k` nearest rows
+    by Hamming distance and only that shortlist is rescored from the int8 codes.
+    """
+
+    def __init__(self, mode: str = "int8", rescore_factor: int = 50, min_shortlist: int = 1000,
+                 scan_chunk_size: int = 2048, initial_capacity: int = 1024):
+        if mode not in ("int8", "binary"):
+            raise ValueError(f"Unknown quantization mode '{mode}', expected 'int8' or 'binary'")
+        super().__init__(initial_capacity=initial_capacity)
+        self.mode = mode
+        self.rescore_factor = rescore_factor
+        self.min_shortlist = min_shortlist
+        self.scan_chunk_size = scan_chunk_size
+        self._row_arrays = ("_matrix", "_scales", "_bits") if mode == "binary" else ("_matrix", "_scales")
+        self._scales = None
+        self._bits = None
+
+    def _allocate(self, capacity: int, dim: int):
+        self._matrix = np.empty((capacity, dim), dtype=np.int8)
+        self._scales = np.empty(capacity, dtype=np.float32)
+        if self.mode == "binary":
+            self._bits = np.empty((capacity, (dim + 7) // 8), dtype=np.uint8)
+
+    def _encode(self, vectors: np.ndarray) -> dict:
+        # Per-row symmetric scaling keeps the full int8 range for every vector
+        max_abs = np.abs(vectors).max(axis=1, keepdims=True)
+        max_abs[max_abs == 0] = 1.0
+        encoded = {
+            "_matrix": np.round(vectors / max_abs * 127).astype(np.int8),
+            "_scales": (max_abs / 127).ravel(),
+        }
+        if self.mode == "binary":
+            encoded["_bits"] = np.packbits(vectors > 0, axis=1)
+        return encoded
+
+    def _int8_scores(self, query: np.ndarray, rows: np.ndarray | None = None) -> np.ndarray:
+        n = len(self.ids) if rows is None else len(rows)
+        scores = np.empty(n, dtype=np.float32)
+        # Dequantize in small chunks so the float32 copy stays cache-resident
+        for start in range(0, n, self.scan_chunk_size):
+            end = min(start + self.scan_chunk_size, n)
+            index = slice(start, end) if rows is None else rows[start:end]
+            scores[start:end] = (self._matrix[index].astype(np.float32) @ query) * self._scales[index]
+        return scores
+
+    def _hamming_shortlist(self, query: np.ndarray, rows: np.ndarray | None, size: int) -> np.ndarray:
+        query_bits = np.packbits(query > 0)
+        bits = self._bits[:len(self.ids)] if rows is None else self._bits[rows]
+        distances = _popcount(np.bitwise_xor(bits, query_bits)).sum(axis=1, dtype=np.int32)
+        if size < len(distances):
+            shortlist = np.argpartition(distances, size - 1)[:size]
+        else:
+            shortlist = np.arange(len(distances))
+        return shortlist if rows is None else rows[shortlist]
+
+    def search(self, query_embedding: np.ndarray, top_k: int = 2,
+               candidate_ids: Iterable[str] | None = None) -> List[Tuple[str, float]]:
+        if not self.ids or top_k <= 0:
+            return []
+        query = self._normalize(query_embedding).ravel()
+        rows = None if candidate_ids is None else self.rows_for(candidate_ids)
+        if self.mode == "binary":
+            size = max(self.min_shortlist, self.rescore_factor * top_k)
+            rows = self._hamming_shortlist(query, rows, size)
+        scores = self._int8_scores(query, rows)
+        order = self._top_k(scores, top_k)
+        if rows is None:
+            return [(self.ids[i], float(scores[i])) for i in order]
+        return [(self.ids[rows[i]], float(scores[i])) for i in order]
+
+    def search_batch(self, query_embeddings: np.ndarray, top_k: int = 2, **_) -> List[List[Tuple[str, float]]]:
+        return [self.search(query, top_k) for query in np.atleast_2d(query_embeddings)]
+
+
+VECTOR_STORES = {
+    "exact": MatrixVectorStore,
+    "ivf": IVFVectorStore,
+    "int8": lambda **options: QuantizedVectorStore(mode="int8", **options),
+    "binary": lambda **options: QuantizedVectorStore(mode="binary", **options),
+}
+
+
+def make_vector_store(kind: str = "exact", **options) -> MatrixVectorStore:
+    if kind not in VECTOR_STORES:
+        raise ValueError(f"Unknown vector store '{kind}', expected one of {sorted(VECTOR_STORES)}")
+    return VECTOR_STORES[kind](**options)
+
+
+def recall_at_k(store: MatrixVectorStore, reference: MatrixVectorStore, queries: np.ndarray, top_k: int) -> float:
+    """Fraction of the reference (exact) top-k ids that `store` also returns."""
+    hits = 0
+    for query in queries:
+        expected = {emp_id for emp_id, _ in reference.search(query, top_k)}
+        found = {emp_id for emp_id, _ in store.search(query, top_k)}
+        hits += len(expected & found)
+    return hits / (len(queries) * top_k)
@@ -1,70 +1,182 @@
+import argparse
+import asyncio
+import hashlib
 import json
-from sentence_transformers import SentenceTransformer
 import weaviate
 from weaviate.classes.config import Configure
-from openai import OpenAI
+from weaviate.classes.query import Filter
+from weaviate.util import generate_uuid5
+from openai import AsyncOpenAI, OpenAI, RateLimitError
 import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from encoder_registry import get_encoder
+from answer_cache import SemanticAnswerCache
+from embeddings import EmbeddingCache, ParallelEncoder, encode_with_cache
+from query_cache import LRUCache, encode_queries_cached
+from record_stream import iter_record_chunks
+from index_sync import diff_employees, employee_fingerprint
+from context_packing import pack_context
+from reranker import CrossEncoderReranker
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+SAMPLE_QUESTIONS = [
+    "Who has Python and machine learning skills?",
+    "Find someone with sales experience",
+    "Who works in HR?",
+    "Do we have any finance analysts?"
+]
 
 
 class WeaviateRAGDemo:
-    def __init__(self):
-        # Load embedding model
-        # Load embedding model
-        # Initialize the encoder model using SentenceTransformer.
+    def __init__(self, cache_path="embedding_cache.sqlite", incremental=False, host="localhost", port=8080,
+                 grpc_port=50051, query_cache_size=1024, encode_workers=1, torch_threads=None,
+                 context_token_budget=150, context_candidates=5, reranker=None, rerank_shortlist=20,
+                 retrieve_budget_ms=None, rerank_budget_ms=250, answer_cache_path="answer_cache.sqlite",
+                 answer_cache_threshold=0.95, answer_cache_ttl_s=24 * 3600, answer_cache_size=1000,
+                 encoder=None, client=None, openai_client=None):
+        # Embedding model
         # 'all-MiniLM-L6-v2' is a lightweight, efficient pre-trained model
         # that converts text into embeddings (dense vector representations).
         # This particular model is widely used because it balances speed and accuracy,
         # making it well-suited for tasks like semantic search, clustering, and
         # comparing the similarity between sentences or documents.
-        self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
+        # It is loaded on first use and shared by all instances (see the encoder property).
+        self._encoder = encoder
+
+        # Persistent cache so unchanged employees are never re-embedded (cache_path=None disables it)
+        self.embedding_cache = EmbeddingCache(cache_path, MODEL_NAME) if cache_path else None
+
+        # Optional process pool for ingestion, one model copy per worker (created on first use)
+        self.encode_workers = encode_workers
+        self.torch_threads = torch_threads
+        self._parallel_encoder = None
+
+        # LRU cache of query -> embedding so repeated questions skip the encoder
+        self.query_cache = LRUCache(query_cache_size)
+
+        # respond_with_rag retrieves context_candidates employees and packs as much of them as fits
+        # in context_token_budget prompt tokens (see context_packing.py)
+        self.context_token_budget = context_token_budget
+        self.context_candidates = context_candidates
+
+        # Those candidates are the cross-encoder's pick of the top rerank_shortlist vector hits
+        # (0 disables re-ranking); see retrieve_context for the per-stage latency budgets
+        self.reranker = reranker or CrossEncoderReranker()
+        self.rerank_shortlist = rerank_shortlist
+        self.retrieve_budget_ms = retrieve_budget_ms
+        self.rerank_budget_ms = rerank_budget_ms
+
+        # Answers with RAG are reused for near-identical questions (cosine >= answer_cache_threshold)
+        # asked within answer_cache_ttl_s, as long as the retrieved context is unchanged;
+        # answer_cache_path=None disables it
+        self.answer_cache = SemanticAnswerCache(answer_cache_path, MODEL_NAME, answer_cache_threshold,
+                                                answer_cache_ttl_s, answer_cache_size) if answer_cache_path else None
 
         # Initialize OpenAI client
-        self.openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.openai_client = openai_client or OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
-        # Connect to local Weaviate v4 - Updated connection method
-        self.client = weaviate.connect_to_local(
-            host="localhost",
-            port=8080
-        )
+        # Connect to local Weaviate v4 on first use, not here, so constructing the demo is cheap
+        # (host/port can point at any local server; `client` accepts an already-built
+        # client such as weaviate_standin.StandInClient for tests and benchmarks)
+        self._client = client
+        self._connection = dict(host=host, port=port, grpc_port=grpc_port)
+        self.incremental = incremental
+        self._collection = None
 
-        # Delete existing collection if exists
-        if self.client.collections.exists("Employee"):
+    @property
+    def encoder(self):
+        if self._encoder is None:
+            self._encoder = get_encoder(MODEL_NAME)
+        return self._encoder
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = weaviate.connect_to_local(**self._connection)
+        return self._client
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = self._setup_collection()
+        return self._collection
+
+    def _setup_collection(self):
+        # Delete existing collection if exists, unless we are syncing incrementally
+        if self.client.collections.exists("Employee") and not self.incremental:
             self.client.collections.delete("Employee")
 
+        # Incremental sync matches objects by employee_id/fingerprint (and uuid5 ids); a collection
+        # created before those existed can't be synced without duplicating every record, so rebuild it
+        if self.client.collections.exists("Employee"):
+            existing = {p.name for p in self.client.collections.get("Employee").config.get().properties}
+            if not {"employee_id", "fingerprint"} <= existing:
+                print("Employee collection predates incremental sync (no employee_id/fingerprint); recreating it")
+                self.client.collections.delete("Employee")
+
         # Create Employee collection with external vectors - Updated configuration
-        self.client.collections.create(
-            name="Employee",
-            vectorizer_config=None,  # disable internal vectorizer
-            properties=[
-                weaviate.classes.config.Property(name="name", data_type=weaviate.classes.config.DataType.TEXT),
-                weaviate.classes.config.Property(name="department", data_type=weaviate.classes.config.DataType.TEXT),
-                weaviate.classes.config.Property(name="position", data_type=weaviate.classes.config.DataType.TEXT),
-                weaviate.classes.config.Property(name="skills", data_type=weaviate.classes.config.DataType.TEXT_ARRAY),
-                weaviate.classes.config.Property(name="projects",
-                                                 data_type=weaviate.classes.config.DataType.TEXT_ARRAY),
-                weaviate.classes.config.Property(name="notes", data_type=weaviate.classes.config.DataType.TEXT),
-            ]
-        )
-        self.collection = self.client.collections.get("Employee")
+        if not self.client.collections.exists("Employee"):
+            self.client.collections.create(
+                name="Employee",
+                vectorizer_config=None,  # disable internal vectorizer
+                properties=[
+                    weaviate.classes.config.Property(name="employee_id",
+                                                     data_type=weaviate.classes.config.DataType.TEXT),
+                    weaviate.classes.config.Property(name="fingerprint",
+                                                     data_type=weaviate.classes.config.DataType.TEXT),
+                    weaviate.classes.config.Property(name="name", data_type=weaviate.classes.config.DataType.TEXT),
+                    weaviate.classes.config.Property(name="department", data_type=weaviate.classes.config.DataType.TEXT),
+                    weaviate.classes.config.Property(name="position", data_type=weaviate.classes.config.DataType.TEXT),
+                    weaviate.classes.config.Property(name="skills", data_type=weaviate.classes.config.DataType.TEXT_ARRAY),
+                    weaviate.classes.config.Property(name="projects",
+                                                     data_type=weaviate.classes.config.DataType.TEXT_ARRAY),
+                    weaviate.classes.config.Property(name="notes", data_type=weaviate.classes.config.DataType.TEXT),
+                ]
+            )
+        return self.client.collections.get("Employee")
 
     def __del__(self):
         # Close connection when object is destroyed
-        if hasattr(self, 'client'):
-            self.client.close()
+        if getattr(self, '_client', None) is not None:
+            self._client.close()
+        if getattr(self, '_parallel_encoder', None) is not None:
+            self._parallel_encoder.close()
+        if getattr(self, 'answer_cache', None) is not None:
+            self.answer_cache.close()
 
     def load_employee_data(self, json_file_path: str):
         with open(json_file_path, 'r') as f:
             return json.load(f)
 
-    def create_employee_embeddings(self, employees):
-        for emp in employees:
-            # Create text for embedding
-            text = f"{emp['name']} {emp['department']} {emp['position']} {', '.join(emp['skills'])} {', '.join(emp['projects'])} {emp['notes']}"
-            embedding = self.encoder.encode(text).tolist()
+    @staticmethod
+    def employee_to_text(emp):
+        return f"{emp['name']} {emp['department']} {emp['position']} {', '.join(emp['skills'])} {', '.join(emp['projects'])} {emp['notes']}"
+
+    def _ingest_encoder(self, batch_size):
+        if self.encode_workers <= 1:
+            return self.encoder, None
+        if self._parallel_encoder is None:
+            self._parallel_encoder = ParallelEncoder(MODEL_NAME, self.encode_workers, self.torch_threads)
+        return self._parallel_encoder, batch_size * self.encode_workers * 4
+
+    def create_employee_embeddings(self, employees, batch_size=64, show_progress=True,
+                                   upload_batch_size=200, concurrency=2, max_retries=3):
+        # Create all texts up front and encode them in batches (cached ones are skipped)
+        texts = [self.employee_to_text(emp) for emp in employees]
+        encoder, chunk_size = self._ingest_encoder(batch_size)
+        embeddings = encode_with_cache(encoder, texts, self.embedding_cache, batch_size=batch_size,
+                                       show_progress=show_progress, chunk_size=chunk_size)
 
-            # Insert with explicit vector
-            self.collection.data.insert(
-                properties={
+        # Objects with explicit vectors
+        objects = [
+            {
+                "properties": {
+                    "employee_id": emp["employee_id"],
+                    "fingerprint": employee_fingerprint(emp),
                     "name": emp["name"],
                     "department": emp["department"],
                     "position": emp["position"],
@@ -72,30 +184,113 @@ class WeaviateRAGDemo:
                     "projects": emp["projects"],
                     "notes": emp["notes"],
                 },
-                vector=embedding
+                "vector": embedding.tolist(),
+                # Deterministic id so re-inserting a changed employee overwrites the old object
+                "uuid": generate_uuid5(emp["employee_id"]),
+            }
+            for emp, embedding in zip(employees, embeddings)
+        ]
+        return self.upload_objects(objects, upload_batch_size, concurrency, max_retries, show_progress)
+
+    def upload_objects(self, objects, batch_size=200, concurrency=2, max_retries=3, show_progress=True):
+        """Send objects through Weaviate's batch API, retrying the ones that fail.
+
+        Returns the list of objects that still failed after max_retries attempts.
+        """
+        started = time.perf_counter()
+        pending = objects
+        for attempt in range(max_retries + 1):
+            if not pending:
+                break
+            if attempt > 0 and show_progress:
+                print(f"Retrying {len(pending)} failed objects (attempt {attempt}/{max_retries})")
+            with self.collection.batch.fixed_size(batch_size=batch_size, concurrent_requests=concurrency) as batch:
+                for obj in pending:
+                    batch.add_object(properties=obj["properties"], vector=obj["vector"], uuid=obj["uuid"])
+
+            failed_uuids = set()
+            for failure in self.collection.batch.failed_objects:
+                failed_uuids.add(str(failure.object_.uuid))
+                if show_progress:
+                    print(f"  Failed {failure.object_.properties.get('employee_id')}: {failure.message}")
+            pending = [obj for obj in pending if str(obj["uuid"]) in failed_uuids]
+
+        if show_progress:
+            elapsed = time.perf_counter() - started
+            uploaded = len(objects) - len(pending)
+            print(f"Uploaded {uploaded}/{len(objects)} objects in {elapsed:.2f}s "
+                  f"({uploaded / max(elapsed, 1e-9):.1f} objects/sec), {len(pending)} failed")
+        return pending
+
+    def ingest_file(self, json_file_path, chunk_size=1000, batch_size=64, show_progress=True):
+        """Stream records from a JSON array or JSON Lines file and upload them chunk by chunk"""
+        total = 0
+        for chunk in iter_record_chunks(json_file_path, chunk_size):
+            self.create_employee_embeddings(chunk, batch_size=batch_size, show_progress=show_progress)
+            total += len(chunk)
+        return total
+
+    def indexed_fingerprints(self):
+        """employee_id -> fingerprint for every object already in the collection"""
+        indexed = {}
+        for obj in self.collection.iterator(return_properties=["employee_id", "fingerprint"]):
+            if obj.properties.get("employee_id"):
+                indexed[obj.properties["employee_id"]] = obj.properties.get("fingerprint")
+        return indexed
+
+    def sync_employees(self, employees, batch_size=64, show_progress=True):
+        """Upsert only new or changed employees and delete the ones that disappeared"""
+        upserts, deletes = diff_employees(self.indexed_fingerprints(), employees)
+        if deletes:
+            self.collection.data.delete_many(
+                where=Filter.by_id().contains_any([generate_uuid5(emp_id) for emp_id in deletes])
             )
+        if upserts:
+            self.create_employee_embeddings(upserts, batch_size=batch_size, show_progress=show_progress)
+        if show_progress:
+            print(f"Sync: {len(upserts)} upserted, {len(deletes)} deleted, "
+                  f"{len(employees) - len(upserts)} unchanged")
+        return upserts, deletes
 
     def search_employees(self, query, top_k=2):
-        query_vec = self.encoder.encode(query).tolist()
+        query_vec = encode_queries_cached(self.encoder, self.query_cache, [query])[0].tolist()
         results = self.collection.query.near_vector(
             near_vector=query_vec,
             limit=top_k
         )
         return [r.properties for r in results.objects]
 
+    def search_employees_batch(self, queries, top_k=2, batch_size=64):
+        # One encoder call for all queries; Weaviate still gets one near_vector request per query
+        query_vecs = encode_queries_cached(self.encoder, self.query_cache, queries, batch_size=batch_size)
+        results = []
+        for query_vec in query_vecs:
+            response = self.collection.query.near_vector(near_vector=query_vec.tolist(), limit=top_k)
+            results.append([r.properties for r in response.objects])
+        return results
+
+    def retrieve_context(self, question: str, timings: dict | None = None):
+        """The context_candidates employees to answer from: vector recall of the top rerank_shortlist,
+        re-ranked by the cross-encoder.
+
+        Re-ranking is skipped if recall alone took longer than retrieve_budget_ms, and stops
+        scoring new batches after rerank_budget_ms. `timings` (if given) receives retrieve_s,
+        rerank_s and reranked.
+        """
+        timings = timings if timings is not None else {}
+        started = time.perf_counter()
+        results = self.search_employees(question, top_k=max(self.rerank_shortlist, self.context_candidates))
+        timings["retrieve_s"] = time.perf_counter() - started
+        if not _should_rerank(self, results, timings):
+            timings["rerank_s"], timings["reranked"] = 0.0, 0
+            return results[:self.context_candidates]
+        return self.reranker.rerank_records(question, results, [self.employee_to_text(r) for r in results],
+                                            self.context_candidates, _rerank_budget_s(self), timings)
+
     def respond_without_rag(self, question: str) -> str:
         """Generate response using only OpenAI without RAG context"""
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system",
-                     "content": "You are a helpful HR assistant. You don't have access to specific employee databases or records."},
-                    {"role": "user", "content": question}
-                ],
-                max_tokens=150,
-                temperature=0.7
-            )
+            response = self.openai_client.chat.completions.create(**without_rag_request(question))
             return response.choices[0].message.content.strip()
         except Exception as e:
             return f"Error calling OpenAI: {str(e)}"
@@ -103,31 +298,294 @@ class WeaviateRAGDemo:
     def respond_with_rag(self, question: str) -> str:
         """Generate response using OpenAI with RAG context from Weaviate"""
         try:
-            # Get only top 1 result to minimize context size and cost
-            results = self.search_employees(question, top_k=1)
-
-            if not results:
-                context = "No employee found."
-            else:
-                # Minimized context format to reduce token count
-                emp = results[0]
-                context = f"{emp['name']}: {emp['position']}, {emp['department']}, skills: {', '.join(emp['skills'][:3])}"  # Limit to top 3 skills
-
-            # Generate response with minimal context
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "HR assistant. Answer using provided employee data."},
-                    {"role": "user", "content": f"{context}\n\nQ: {question}"}  # Compact format
-                ],
-                max_tokens=80,  # Reduced from 250 to minimize cost
-                temperature=0.1,  # Very low for consistent, focused responses
-                top_p=0.8
-            )
-            return response.choices[0].message.content.strip()
+            results = self.retrieve_context(question)
+            request = with_rag_request(question, results, self.context_token_budget)
+            cache_key = self._answer_cache_key(question, request)
+            if cache_key is not None:
+                answer = self.answer_cache.get(*cache_key)
+                if answer is not None:
+                    return answer
+            response = self.openai_client.chat.completions.create(**request)
+            answer = response.choices[0].message.content.strip()
+            if cache_key is not None:
+                self.answer_cache.put(question, *cache_key, answer)
+            return answer
         except Exception as e:
             return f"Error with RAG or OpenAI call: {str(e)}"
 
+    def _answer_cache_key(self, question, request):
+        # (query embedding, context key) for the answer cache; retrieval has to run first so
+        # that an answer built from since-changed employee records is never served
+        if self.answer_cache is None:
+            return None
+        query_vec = encode_queries_cached(self.encoder, self.query_cache, [question])[0]
+        return query_vec, answer_context_key(question, request)
+
+    def stream_without_rag(self, question: str, timings: dict | None = None):
+        """Like respond_without_rag, but yields the answer text as it is generated"""
+        yield from stream_completion(self.openai_client, without_rag_request(question), timings)
+
+    def stream_with_rag(self, question: str, timings: dict | None = None):
+        """Like respond_with_rag, but yields the answer text as it is generated.
+
+        If given, `timings` is filled with ttft_s (time to first token) and total_s,
+        both measured from the call, so retrieval time is included, plus cached
+        (True when the answer came from the answer cache in one piece).
+        """
+        started = time.perf_counter()
+        timings = timings if timings is not None else {}
+        results = self.retrieve_context(question)
+        request = with_rag_request(question, results, self.context_token_budget)
+        cache_key = self._answer_cache_key(question, request)
+        answer = self.answer_cache.get(*cache_key) if cache_key is not None else None
+        timings["cached"] = answer is not None
+        if answer is not None:
+            timings["ttft_s"] = timings["total_s"] = time.perf_counter() - started
+            yield answer
+            return
+        tokens = []
+        for token in stream_completion(self.openai_client, request, timings, started):
+            tokens.append(token)
+            yield token
+        if cache_key is not None:
+            self.answer_cache.put(question, *cache_key, "".join(tokens).strip())
+
+
+def _should_rerank(rag, results, timings):
+    over_budget = rag.retrieve_budget_ms is not None and timings["retrieve_s"] * 1000 > rag.retrieve_budget_ms
+    return rag.rerank_shortlist > 0 and len(results) > 1 and not over_budget
+
+
+def _rerank_budget_s(rag):
+    return rag.rerank_budget_ms / 1000 if rag.rerank_budget_ms is not None else None
+
+
+def stream_completion(openai_client, request, timings=None, started=None):
+    """Yield the content deltas of a streamed chat completion, recording ttft_s and total_s in `timings`"""
+    started = started if started is not None else time.perf_counter()
+    timings = timings if timings is not None else {}
+    timings["ttft_s"] = None
+    for chunk in openai_client.chat.completions.create(**request, stream=True):
+        token = chunk.choices[0].delta.content if chunk.choices else None
+        if token:
+            if timings["ttft_s"] is None:
+                timings["ttft_s"] = time.perf_counter() - started
+            yield token
+    timings["total_s"] = time.perf_counter() - started
+
+
+async def astream_completion(openai_client, request, timings=None, started=None):
+    """Async-iterator version of stream_completion for an AsyncOpenAI client"""
+    started = started if started is not None else time.perf_counter()
+    timings = timings if timings is not None else {}
+    timings["ttft_s"] = None
+    async for chunk in await openai_client.chat.completions.create(**request, stream=True):
+        token = chunk.choices[0].delta.content if chunk.choices else None
+        if token:
+            if timings["ttft_s"] is None:
+                timings["ttft_s"] = time.perf_counter() - started
+            yield token
+    timings["total_s"] = time.perf_counter() - started
+
+
+def without_rag_request(question):
+    """Chat completion arguments for answering without any employee context"""
+    return dict(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system",
+             "content": "You are a helpful HR assistant. You don't have access to specific employee databases or records."},
+            {"role": "user", "content": question}
+        ],
+        max_tokens=150,
+        temperature=0.7
+    )
+
+
+def answer_context_key(question, request):
+    """Hash of a with_rag_request minus the question: equal keys mean same model settings and context"""
+    *history, user = request["messages"]
+    prompt = dict(request, messages=history + [dict(user, content=user["content"].removesuffix(question))])
+    return hashlib.sha256(json.dumps(prompt, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def with_rag_request(question, results, token_budget=150):
+    """Chat completion arguments for answering from the retrieved employees"""
+    # Pack the best-ranked employees' most useful fields into a fixed token budget,
+    # so prompt cost and latency stay predictable however much was retrieved
+    context, _ = pack_context(results, token_budget)
+    if not context:
+        context = "No employee found."
+
+    return dict(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": "HR assistant. Answer using provided employee data."},
+            {"role": "user", "content": f"{context}\n\nQ: {question}"}  # Compact format
+        ],
+        max_tokens=80,  # Reduced from 250 to minimize cost
+        temperature=0.1,  # Very low for consistent, focused responses
+        top_p=0.8
+    )
+
+
+class AsyncWeaviateRAGDemo:
+    """asyncio version of the query side of WeaviateRAGDemo.
+
+    Uses the async Weaviate client and AsyncOpenAI, and runs the encoder on a
+    dedicated thread, so many questions can be in flight at once. At most
+    `max_concurrency` questions are processed at a time. The Employee collection
+    must already be populated (e.g. by WeaviateRAGDemo.sync_employees).
+    """
+
+    def __init__(self, host="localhost", port=8080, grpc_port=50051, max_concurrency=16,
+                 query_cache_size=1024, context_token_budget=150, context_candidates=5, reranker=None,
+                 rerank_shortlist=20, retrieve_budget_ms=None, rerank_budget_ms=250,
+                 encoder=None, client=None, openai_client=None):
+        self._encoder = encoder
+        self.openai_client = openai_client or AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.client = client or weaviate.use_async_with_local(host=host, port=port, grpc_port=grpc_port)
+        self.collection = None
+        self.query_cache = LRUCache(query_cache_size)
+        self.context_token_budget = context_token_budget
+        self.context_candidates = context_candidates
+        self.reranker = reranker or CrossEncoderReranker()
+        self.rerank_shortlist = rerank_shortlist
+        self.retrieve_budget_ms = retrieve_budget_ms
+        self.rerank_budget_ms = rerank_budget_ms
+        # One encoder thread (also runs the cross-encoder): the model already uses several intra-op threads, and it keeps the cache single-threaded
+        self._encode_executor = ThreadPoolExecutor(max_workers=1)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @property
+    def encoder(self):
+        if self._encoder is None:
+            self._encoder = get_encoder(MODEL_NAME)
+        return self._encoder
+
+    async def connect(self):
+        await self.client.connect()
+        self.collection = self.client.collections.get("Employee")
+
+    async def close(self):
+        await self.client.close()
+        self._encode_executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def search_employees(self, query, top_k=2):
+        loop = asyncio.get_running_loop()
+        # self.encoder is resolved on the encoder thread, so a first-use model load doesn't block the loop
+        query_vecs = await loop.run_in_executor(
+            self._encode_executor, lambda: encode_queries_cached(self.encoder, self.query_cache, [query]))
+        results = await self.collection.query.near_vector(near_vector=query_vecs[0].tolist(), limit=top_k)
+        return [r.properties for r in results.objects]
+
+    async def retrieve_context(self, question: str, timings: dict | None = None):
+        """See WeaviateRAGDemo.retrieve_context; re-ranking runs on the encoder thread"""
+        timings = timings if timings is not None else {}
+        started = time.perf_counter()
+        results = await self.search_employees(question, top_k=max(self.rerank_shortlist, self.context_candidates))
+        timings["retrieve_s"] = time.perf_counter() - started
+        if not _should_rerank(self, results, timings):
+            timings["rerank_s"], timings["reranked"] = 0.0, 0
+            return results[:self.context_candidates]
+        texts = [WeaviateRAGDemo.employee_to_text(r) for r in results]
+        return await asyncio.get_running_loop().run_in_executor(
+            self._encode_executor, lambda: self.reranker.rerank_records(
+                question, results, texts, self.context_candidates, _rerank_budget_s(self), timings))
+
+    async def respond_without_rag(self, question: str) -> str:
+        async with self._semaphore:
+            try:
+                response = await self.openai_client.chat.completions.create(**without_rag_request(question))
+                return response.choices[0].message.content.strip()
+            except Exception as e:
+                return f"Error calling OpenAI: {str(e)}"
+
+    async def respond_with_rag(self, question: str) -> str:
+        async with self._semaphore:
+            try:
+                results = await self.retrieve_context(question)
+                request = with_rag_request(question, results, self.context_token_budget)
+                response = await self.openai_client.chat.completions.create(**request)
+                return response.choices[0].message.content.strip()
+            except Exception as e:
+                return f"Error with RAG or OpenAI call: {str(e)}"
+
+    async def stream_without_rag(self, question: str, timings: dict | None = None):
+        async with self._semaphore:
+            async for token in astream_completion(self.openai_client, without_rag_request(question), timings):
+                yield token
+
+    async def stream_with_rag(self, question: str, timings: dict | None = None):
+        """Async iterator over the answer text; see WeaviateRAGDemo.stream_with_rag for `timings`"""
+        async with self._semaphore:
+            started = time.perf_counter()
+            results = await self.retrieve_context(question)
+            request = with_rag_request(question, results, self.context_token_budget)
+            async for token in astream_completion(self.openai_client, request, timings, started):
+                yield token
+
+    async def respond_with_rag_many(self, questions):
+        """Answer all questions concurrently (bounded by max_concurrency), in input order"""
+        return await asyncio.gather(*(self.respond_with_rag(q) for q in questions))
+
+    async def _create_with_backoff(self, request, max_retries=5, base_delay=1.0):
+        """Chat completion that sleeps and retries on 429s; returns (response, retries)"""
+        # The SDK's own retries would back off underneath this loop and go uncounted, so they are off here
+        openai_client = self.openai_client.with_options(max_retries=0)
+        for attempt in range(max_retries + 1):
+            try:
+                return await openai_client.chat.completions.create(**request), attempt
+            except RateLimitError as e:
+                if attempt == max_retries:
+                    raise
+                # Honour the server's Retry-After when present, else exponential backoff with jitter
+                retry_after = e.response.headers.get("retry-after") if e.response is not None else None
+                delay = base_delay * 2 ** attempt
+                try:
+                    delay = float(retry_after) if retry_after else delay
+                except ValueError:
+                    # An HTTP-date Retry-After; fall back to the exponential delay
+                    pass
+                await asyncio.sleep(delay * random.uniform(1.0, 1.5))
+
+    async def _evaluate_one(self, question, variant, max_retries=5):
+        async with self._semaphore:
+            started = time.perf_counter()
+            row = {"question": question, "variant": variant, "retries": 0,
+                   "prompt_tokens": None, "completion_tokens": None}
+            try:
+                if variant == "with_rag":
+                    results = await self.retrieve_context(question)
+                    request = with_rag_request(question, results, self.context_token_budget)
+                else:
+                    request = without_rag_request(question)
+                response, row["retries"] = await self._create_with_backoff(request, max_retries)
+                row["answer"] = response.choices[0].message.content.strip()
+                if response.usage is not None:
+                    row["prompt_tokens"] = response.usage.prompt_tokens
+                    row["completion_tokens"] = response.usage.completion_tokens
+            except Exception as e:
+                row["answer"] = f"Error: {e}"
+            row["latency_s"] = time.perf_counter() - started
+            return row
+
+    async def evaluate(self, questions, max_retries=5):
+        """Run the with- and without-RAG variants of every question concurrently.
+
+        Returns one row per call (question, variant, latency_s, prompt_tokens, completion_tokens,
+        retries, answer), ordered by question and then variant.
+        """
+        return await asyncio.gather(*(self._evaluate_one(q, variant, max_retries)
+                                      for q in questions for variant in ("without_rag", "with_rag")))
+
 
 def main():
     try:
@@ -137,9 +595,10 @@ def main():
             print("Set it with: export OPENAI_API_KEY='your-api-key-here'")
             return
 
-        rag = WeaviateRAGDemo()
+        # Keep the existing collection and only re-index employees that changed since the last run
+        rag = WeaviateRAGDemo(incremental=True)
         employees = rag.load_employee_data("employee_records.json")
-        rag.create_employee_embeddings(employees)
+        rag.sync_employees(employees)
 
         # questions = [
         #     "Who has Python and machine learning skills?",
@@ -156,8 +615,13 @@ def main():
             print(f"\n{'=' * 50}")
             print(f"Q: {q}")
             print(f"{'=' * 50}")
-            print("Without RAG:", rag.respond_without_rag(q))
-            print("\nWith RAG:", rag.respond_with_rag(q))
+            # Stream the answers so the first words show up as soon as they are generated
+            for label, stream in (("Without RAG", rag.stream_without_rag), ("\nWith RAG", rag.stream_with_rag)):
+                timings = {}
+                print(f"{label}: ", end="", flush=True)
+                for token in stream(q, timings):
+                    print(token, end="", flush=True)
+                print(f"\n[first token {timings['ttft_s'] or timings['total_s']:.2f}s, total {timings['total_s']:.2f}s]")
 
     except Exception as e:
         print(f"Error: {e}")
@@ -169,5 +633,64 @@ def main():
             del rag
 
 
+async def async_main(questions=None, max_concurrency=16):
+    """Answer many questions concurrently against the already-populated collection"""
+    questions = questions or SAMPLE_QUESTIONS
+    async with AsyncWeaviateRAGDemo(max_concurrency=max_concurrency) as rag:
+        started = time.perf_counter()
+        answers = await rag.respond_with_rag_many(questions)
+        elapsed = time.perf_counter() - started
+    for q, answer in zip(questions, answers):
+        print(f"\nQ: {q}\nWith RAG: {answer}")
+    print(f"\nAnswered {len(questions)} questions in {elapsed:.2f}s")
+
+
+def format_results_table(rows):
+    """Render evaluate() rows as a fixed-width table with per-variant totals"""
+    lines = [f"{'question':<45} {'variant':<12} {'latency':>8} {'prompt':>7} {'compl.':>7} {'retries':>7}"]
+    for row in rows:
+        lines.append(f"{row['question'][:45]:<45} {row['variant']:<12} {row['latency_s']:>7.2f}s "
+                     f"{row['prompt_tokens'] if row['prompt_tokens'] is not None else '-':>7} "
+                     f"{row['completion_tokens'] if row['completion_tokens'] is not None else '-':>7} "
+                     f"{row['retries']:>7}")
+    for variant in ("without_rag", "with_rag"):
+        subset = [row for row in rows if row["variant"] == variant]
+        if subset:
+            latency = sum(row["latency_s"] for row in subset) / len(subset)
+            prompt = sum(row["prompt_tokens"] or 0 for row in subset)
+            completion = sum(row["completion_tokens"] or 0 for row in subset)
+            lines.append(f"{'TOTAL (mean latency)':<45} {variant:<12} {latency:>7.2f}s {prompt:>7} {completion:>7} "
+                         f"{sum(row['retries'] for row in subset):>7}")
+    return "\n".join(lines)
+
+
+async def evaluation_main(questions=None, max_concurrency=8, max_retries=5):
+    """Compare answers with and without RAG for all questions, all calls in flight at once"""
+    questions = questions or SAMPLE_QUESTIONS
+    async with AsyncWeaviateRAGDemo(max_concurrency=max_concurrency) as rag:
+        started = time.perf_counter()
+        rows = await rag.evaluate(questions, max_retries=max_retries)
+        elapsed = time.perf_counter() - started
+    for row in rows:
+        print(f"\n[{row['variant']}] Q: {row['question']}\n{row['answer']}")
+    print()
+    print(format_results_table(rows))
+    sequential = sum(row["latency_s"] for row in rows)
+    print(f"\n{len(rows)} calls in {elapsed:.2f}s wall time ({sequential:.2f}s if run one after another)")
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Employee RAG demo on Weaviate + OpenAI")
+    parser.add_argument("--async", dest="run_async", action="store_true",
+                        help="answer the sample questions concurrently with AsyncWeaviateRAGDemo")
+    parser.add_argument("--eval", action="store_true",
+                        help="run both variants of every sample question concurrently and print a results table")
+    parser.add_argument("--concurrency", type=int, default=8, help="max OpenAI calls in flight (--async/--eval)")
+    parser.add_argument("--max-retries", type=int, default=5, help="retries per call on rate limiting (--eval)")
+    args = parser.parse_args()
+    if args.eval:
+        asyncio.run(evaluation_main(max_concurrency=args.concurrency, max_retries=args.max_retries))
+    elif args.run_async:
+        asyncio.run(async_main(max_concurrency=args.concurrency))
+    else:
+        main()
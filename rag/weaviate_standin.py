@@ -0,0 +1,136 @@
+"""
+In-process stand-in for the parts of the Weaviate v4 client that WeaviateRAGDemo uses.
+
+Pass StandInClient() as WeaviateRAGDemo(client=...) to run ingestion, sync and search
+without a Weaviate server, e.g. in benchmark_rag.py. Vectors are searched exactly with
+NumPy, so this measures the client-side code path, not Weaviate's own HNSW index.
+
+StandInClient(fail_rate=..., fail_uuids=...) makes batch uploads report some objects in
+`batch.failed_objects`, as Weaviate does, so the retry path of upload_objects can be exercised.
+"""
+
+import random
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+
+from vector_store import MatrixVectorStore
+
+
+class StandInCollection:
+    def __init__(self, name, property_names=(), failures=None):
+        self.name = name
+        self.properties = {}
+        self.config = _Config(property_names)
+        self.vectors = MatrixVectorStore()
+        self.batch = _Batch(self, failures or _Failures())
+        self.data = _Data(self)
+        self.query = _Query(self)
+
+    def iterator(self, return_properties=None, **_):
+        for uuid, properties in list(self.properties.items()):
+            if return_properties:
+                properties = {name: properties.get(name) for name in return_properties}
+            yield SimpleNamespace(uuid=uuid, properties=properties)
+
+
+class _Config:
+    def __init__(self, property_names):
+        self.property_names = list(property_names)
+
+    def get(self):
+        return SimpleNamespace(properties=[SimpleNamespace(name=name) for name in self.property_names])
+
+
+class _Failures:
+    """Decides which uploaded objects fail: each of `uuids` fails `times` times, any object with probability `rate`."""
+
+    def __init__(self, rate=0.0, uuids=(), times=1, seed=0):
+        self.rate = rate
+        self.remaining = {str(uuid): times for uuid in uuids}
+        self.rng = random.Random(seed)
+
+    def __call__(self, uuid):
+        if self.remaining.get(uuid, 0) > 0:
+            self.remaining[uuid] -= 1
+            return True
+        return self.rate > 0 and self.rng.random() < self.rate
+
+
+class _Batch:
+    def __init__(self, collection, failures):
+        self.collection = collection
+        self.failures = failures
+        self.failed_objects = []
+
+    @contextmanager
+    def fixed_size(self, batch_size=100, concurrent_requests=2):
+        self.failed_objects = []
+        pending = []
+        yield SimpleNamespace(add_object=lambda properties, vector, uuid: pending.append((str(uuid), properties, vector)))
+        for uuid, properties, vector in pending:
+            if self.failures(uuid):
+                self.failed_objects.append(SimpleNamespace(
+                    object_=SimpleNamespace(uuid=uuid, properties=properties, vector=vector),
+                    message="injected failure (weaviate_standin)"))
+        failed = {failure.object_.uuid for failure in self.failed_objects}
+        pending = [obj for obj in pending if obj[0] not in failed]
+        if pending:
+            self.collection.vectors.add_batch([uuid for uuid, _, _ in pending],
+                                              np.asarray([vector for _, _, vector in pending], dtype=np.float32))
+            for uuid, properties, _ in pending:
+                self.collection.properties[uuid] = properties
+
+
+class _Data:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def delete_many(self, where):
+        # Only the Filter.by_id().contains_any([...]) form used by WeaviateRAGDemo is supported
+        uuids = [str(uuid) for uuid in where.value]
+        self.collection.vectors.remove(uuids)
+        for uuid in uuids:
+            self.collection.properties.pop(uuid, None)
+
+
+class _Query:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def near_vector(self, near_vector, limit=10, **_):
+        matches = self.collection.vectors.search(np.asarray(near_vector, dtype=np.float32), limit)
+        return SimpleNamespace(objects=[
+            SimpleNamespace(uuid=uuid, properties=self.collection.properties[uuid],
+                            metadata=SimpleNamespace(distance=1 - score))
+            for uuid, score in matches
+        ])
+
+
+class _Collections:
+    def __init__(self, failures):
+        self._failures = failures
+        self._collections = {}
+
+    def exists(self, name):
+        return name in self._collections
+
+    def delete(self, name):
+        self._collections.pop(name, None)
+
+    def create(self, name, properties=(), **_):
+        self._collections[name] = StandInCollection(name, [prop.name for prop in properties], self._failures)
+        return self._collections[name]
+
+    def get(self, name):
+        return self._collections[name]
+
+
+class StandInClient:
+    def __init__(self, fail_rate=0.0, fail_uuids=(), fail_times=1, seed=0):
+        # Uploads of `fail_uuids` fail `fail_times` times each, and any upload fails with probability `fail_rate`
+        self.collections = _Collections(_Failures(fail_rate, fail_uuids, fail_times, seed))
+
+    def close(self):
+        pass